@@ -1,11 +1,14 @@
 from __future__ import annotations
 
+import asyncio
+import codecs
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Any, Literal
-from urllib.parse import urlparse
+from functools import lru_cache
+from typing import Any, Literal, cast
 
 from curl_cffi.const import CurlOpt
-from curl_cffi.requests import AsyncSession
+from curl_cffi.requests import AsyncSession, Response
 from curl_cffi.requests import exceptions as curl_exceptions
 from curl_cffi.requests.impersonate import BrowserTypeLiteral
 
@@ -14,6 +17,21 @@ RequestMethod = Literal["GET", "POST", "PUT", "DELETE", "OPTIONS", "HEAD", "TRAC
 DEFAULT_IMPERSONATE: BrowserTypeLiteral = "chrome"
 DEFAULT_TIMEOUT = 30.0
 DEFAULT_MAX_CHARS = 100_000
+ERROR_SNIPPET_CHARS = 300
+DEFAULT_DNS_CACHE_TIMEOUT = 120
+# curl_cffi defaults to 10 pooled curl handles, which would throttle the bulk tool below its
+# own max_concurrency ceiling of 20.
+DEFAULT_MAX_CLIENTS = 20
+RESPONSE_CACHE_SIZE = 256
+
+# Session-wide libcurl defaults; resolutions are cached in the multi handle for two minutes
+# (Firefox's policy) so repeat hosts skip the resolver entirely. TCP keepalive probes stop
+# idle pooled connections from being silently dropped by NATs between tool calls.
+_DEFAULT_CURL_OPTIONS: dict[CurlOpt, Any] = {
+    CurlOpt.DNS_CACHE_TIMEOUT: DEFAULT_DNS_CACHE_TIMEOUT,
+    CurlOpt.DNS_SHUFFLE_ADDRESSES: 1,
+    CurlOpt.TCP_KEEPALIVE: 1,
+}
 
 
 @dataclass(slots=True)
@@ -24,24 +42,46 @@ class FetchResult:
     headers: dict[str, str]
 
 
+@dataclass(slots=True)
+class _CachedResponse:
+    result: FetchResult
+    validators: dict[str, str]
+
+
+# Request options that shape the response and therefore form the cache key.
+_CACHE_KEY_OPTIONS = ("impersonate", "allow_redirects")
+# Options that may accompany a cacheable GET: the key options plus `timeout`, which bounds the
+# wait but not the representation. Anything else (custom headers, cookies, proxies, ...) could
+# change the response, so those requests bypass the cache.
+_CACHEABLE_OPTIONS = frozenset({*_CACHE_KEY_OPTIONS, "timeout"})
+_CacheKey = tuple[Any, ...]
+
+# Complete bodies fetched through the pooled session, keyed by URL plus the options that shape
+# the response. Entries are always revalidated; a 304 replays the stored body.
+_RESPONSE_CACHE: OrderedDict[_CacheKey, _CachedResponse] = OrderedDict()
+
+
 class FetchError(RuntimeError):
     """Raised when a fetch request cannot produce a usable response."""
 
 
+# Includes aliases such as WRITEHEADER, which iterating the enum would skip.
+_CURLOPT_BY_NAME: dict[str, CurlOpt] = dict(CurlOpt.__members__)
+
+
+@lru_cache(maxsize=256)
 def _to_curl_option_key(option: str | int) -> CurlOpt:
     if isinstance(option, int):
         return CurlOpt(option)
-    normalized = option.strip()
-    if normalized.startswith("CurlOpt."):
-        normalized = normalized.split(".", 1)[1]
+    normalized = option.strip().removeprefix("CurlOpt.")
+    key = _CURLOPT_BY_NAME.get(normalized)
+    if key is not None:
+        return key
     if normalized.lstrip("-").isdigit():
         return CurlOpt(int(normalized))
-    try:
-        return getattr(CurlOpt, normalized)
-    except AttributeError as exc:
-        raise ValueError(
-            f"Unsupported curl option key: {option}. Use CurlOpt names (e.g., TIMEOUT_MS)."
-        ) from exc
+    raise ValueError(
+        f"Unsupported curl option key: {option}. Use CurlOpt names (e.g., TIMEOUT_MS)."
+    )
 
 
 def _normalize_curl_options(
@@ -69,7 +109,11 @@ def _truncate(value: str, max_chars: int) -> str:
         return "[truncated at 0 chars]"
     if len(value) <= max_chars:
         return value
-    return f"{value[:max_chars].rstrip()}\n[truncated at {max_chars} chars]"
+    # Trim trailing whitespace by index so only one slice of the (possibly huge) prefix is made.
+    end = max_chars
+    while end and value[end - 1].isspace():
+        end -= 1
+    return f"{value[:end]}\n[truncated at {max_chars} chars]"
 
 
 def _create_session(
@@ -77,15 +121,42 @@ def _create_session(
     timeout: float = DEFAULT_TIMEOUT,
     follow_redirects: bool = True,
     session_options: dict[str, Any] | None = None,
+    max_clients: int = DEFAULT_MAX_CLIENTS,
 ) -> AsyncSession:
     options = _normalize_options(session_options)
     options.setdefault("impersonate", impersonate)
     options.setdefault("timeout", timeout)
     options.setdefault("allow_redirects", follow_redirects)
     options.setdefault("raise_for_status", False)
+    options.setdefault("max_clients", max_clients)
+    options["curl_options"] = {**_DEFAULT_CURL_OPTIONS, **(options.get("curl_options") or {})}
     return AsyncSession(**options)
 
 
+_SESSION: AsyncSession | None = None
+
+
+async def _get_session() -> AsyncSession:
+    """Return the process-wide pooled session, creating it on first use.
+
+    One session should be shared for the app's lifetime so keep-alive connections,
+    TLS session tickets, and libcurl's connection cache are reused across `_fetch` calls.
+    """
+    global _SESSION
+    if _SESSION is None:
+        _SESSION = _create_session()
+    return _SESSION
+
+
+async def aclose() -> None:
+    """Close the pooled session; the next `_get_session` call creates a fresh one."""
+    global _SESSION
+    session, _SESSION = _SESSION, None
+    _RESPONSE_CACHE.clear()
+    if session is not None:
+        await session.close()
+
+
 def _handle_error(
     error: Exception,
     status_code: int | None = None,
@@ -96,7 +167,7 @@ def _handle_error(
         if snippet:
             return f"HTTP {status_code} error. Response snippet: {snippet}"
         return f"HTTP {status_code} error."
-    if isinstance(error, curl_exceptions.Timeout):
+    if isinstance(error, (curl_exceptions.Timeout, TimeoutError)):
         return "Request timed out. Try increasing the timeout value."
     if isinstance(error, (curl_exceptions.DNSError, curl_exceptions.ConnectionError)):
         return "DNS/connection failed. Check that the URL is correct and reachable."
@@ -112,6 +183,79 @@ def _handle_error(
     return f"Request failed: {type(error).__name__}: {error}"
 
 
+def _total_timeout(session: AsyncSession, request_kwargs: dict[str, Any]) -> float | None:
+    # Streamed transfers only get connect/low-speed limits from curl_cffi, so the overall
+    # deadline is enforced on the event loop instead. None or 0 means no limit.
+    timeout = request_kwargs.get("timeout", session.timeout)
+    if isinstance(timeout, tuple):
+        timeout = sum(timeout)
+    return float(timeout) if isinstance(timeout, (int, float)) and timeout > 0 else None
+
+
+async def _close_stream(response: Response) -> None:
+    # Setting quit_now makes libcurl abort on the next body chunk instead of draining it.
+    if response.quit_now is not None:
+        response.quit_now.set()
+    await response.aclose()
+
+
+async def _read_text(response: Response, max_chars: int) -> str:
+    """Decode a streamed body into at most ``max_chars + 1`` characters.
+
+    Only the characters needed for truncation are ever held in memory; the rest of the
+    transfer is aborted rather than downloaded.
+    """
+    try:
+        decoder = codecs.getincrementaldecoder(response.encoding)(errors="replace")
+    except LookupError:
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    parts: list[str] = []
+    size = 0
+    try:
+        async for chunk in response.aiter_content():
+            piece = decoder.decode(chunk)
+            parts.append(piece)
+            size += len(piece)
+            if size > max_chars:
+                # Keep a single character past the limit so `_truncate` still sees the overflow.
+                parts[-1] = piece[: len(piece) - (size - max_chars - 1)]
+                break
+        else:
+            parts.append(decoder.decode(b"", final=True))
+    finally:
+        await _close_stream(response)
+    return "".join(parts)
+
+
+def _cache_key(
+    session: AsyncSession,
+    url: str,
+    method: RequestMethod,
+    request_kwargs: dict[str, Any],
+) -> _CacheKey | None:
+    # Only plain GETs through the pooled session are cached; ephemeral sessions carry their
+    # own options and are discarded after a single tool call anyway.
+    if session is not _SESSION or method != "GET":
+        return None
+    if not request_kwargs.keys() <= _CACHEABLE_OPTIONS:
+        return None
+    return (url, *(request_kwargs.get(option) for option in _CACHE_KEY_OPTIONS))
+
+
+def _store_response(key: _CacheKey, response: Response, result: FetchResult) -> None:
+    validators: dict[str, str] = {}
+    if etag := response.headers.get("ETag"):
+        validators["If-None-Match"] = etag
+    if last_modified := response.headers.get("Last-Modified"):
+        validators["If-Modified-Since"] = last_modified
+    if not validators or "no-store" in (response.headers.get("Cache-Control") or ""):
+        return
+    _RESPONSE_CACHE[key] = _CachedResponse(result=result, validators=validators)
+    _RESPONSE_CACHE.move_to_end(key)
+    if len(_RESPONSE_CACHE) > RESPONSE_CACHE_SIZE:
+        _RESPONSE_CACHE.popitem(last=False)
+
+
 async def _fetch(
     session: AsyncSession,
     url: str,
@@ -125,8 +269,9 @@ async def _fetch(
     request_options: dict[str, Any] | None = None,
     max_chars: int = DEFAULT_MAX_CHARS,
 ) -> FetchResult:
-    parsed = urlparse(url)
-    if parsed.scheme not in {"http", "https"}:
+    # Only the scheme is needed, so skip urlparse's full split.
+    scheme, sep, _ = url.partition("://")
+    if not sep or scheme.lower() not in {"http", "https"}:
         raise ValueError("Only http/https URLs are supported.")
 
     request_kwargs = _normalize_options(request_options)
@@ -140,22 +285,35 @@ async def _fetch(
     if follow_redirects is not None:
         request_kwargs["allow_redirects"] = follow_redirects
 
+    request_kwargs.pop("stream", None)
+
     if body is not None and "json" not in request_kwargs and "data" not in request_kwargs:
         if isinstance(body, (dict, list)):
             request_kwargs["json"] = body
         else:
             request_kwargs["data"] = body
 
+    cache_key = _cache_key(session, url, method, request_kwargs)
+    cached = _RESPONSE_CACHE.get(cache_key) if cache_key is not None else None
+    if cached is not None:
+        request_kwargs["headers"] = cached.validators
+
     try:
-        response = await session.request(method=method, url=url, **request_kwargs)
+        async with asyncio.timeout(_total_timeout(session, request_kwargs)):
+            response = await session.request(
+                method=method, url=url, stream=True, **request_kwargs
+            )
+            limit = ERROR_SNIPPET_CHARS if response.status_code >= 400 else max_chars
+            text = await _read_text(response, max_chars=limit)
     except (TypeError, ValueError) as exc:
         raise FetchError(f"Invalid curl_cffi options: {exc}") from exc
     except curl_exceptions.RequestException as exc:
         raise FetchError(_handle_error(exc)) from exc
+    except TimeoutError as exc:
+        raise FetchError(_handle_error(exc)) from exc
 
-    text = response.text
     if response.status_code >= 400:
-        snippet = _truncate(text, max_chars=300)
+        snippet = _truncate(text, max_chars=ERROR_SNIPPET_CHARS)
         raise FetchError(
             _handle_error(
                 RuntimeError(f"HTTP {response.status_code}"),
@@ -164,9 +322,36 @@ async def _fetch(
             )
         )
 
-    return FetchResult(
+    if response.status_code == 304 and cached is not None and cache_key is not None:
+        # The 304's headers (Date, Cache-Control, a new ETag, ...) replace the stored ones; an
+        # old Set-Cookie is never replayed.
+        fresh = cast(dict[str, str], dict(response.headers.items()))
+        replaced = {name.lower() for name in fresh} | {"set-cookie"}
+        stored = cached.result
+        headers = {k: v for k, v in stored.headers.items() if k.lower() not in replaced}
+        headers.update(fresh)
+        cached.result = FetchResult(
+            status_code=stored.status_code,
+            final_url=stored.final_url,
+            text=stored.text,
+            headers=headers,
+        )
+        _RESPONSE_CACHE.move_to_end(cache_key)
+        return FetchResult(
+            status_code=stored.status_code,
+            final_url=stored.final_url,
+            text=_truncate(stored.text, max_chars=max_chars),
+            headers=dict(headers),
+        )
+
+    result = FetchResult(
         status_code=response.status_code,
         final_url=str(response.url),
         text=_truncate(text, max_chars=max_chars),
-        headers={str(k): str(v) for k, v in response.headers.items()},
+        # Headers.items() already decodes to str and folds repeated keys; copy it as-is.
+        headers=cast(dict[str, str], dict(response.headers.items())),
     )
+    # Only a complete body can be replayed for a later call with a larger max_chars.
+    if cache_key is not None and response.status_code == 200 and len(text) <= max_chars:
+        _store_response(cache_key, response, result)
+    return result
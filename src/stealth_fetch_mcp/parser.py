@@ -1,95 +1,248 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import json
+import os
 import re
-import xml.etree.ElementTree as ET
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import cached_property, lru_cache, partial
+from io import BytesIO
 from typing import Any
 from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup, NavigableString, Tag
-from bs4.element import AttributeValueList, PageElement
+import lxml.html
+import orjson
+from lxml import etree
+from lxml.cssselect import CSSSelector
+
+from stealth_fetch_mcp.client import _truncate
+
+try:
+    from selectolax.lexbor import LexborHTMLParser, LexborNode, SelectolaxError
+except ImportError:  # optional accelerator; the lxml paths below cover everything without it
+    _HAS_LEXBOR = False
+else:
+    _HAS_LEXBOR = True
 
 NOISE_TAGS = {"script", "style", "noscript", "nav", "footer", "aside", "form", "svg", "iframe"}
 
+_HEADING_PREFIX: dict[Any, str] = {
+    "h1": "# ", "h2": "## ", "h3": "### ", "h4": "#### ", "h5": "##### ", "h6": "###### "
+}
+_TRACKED = ("h1", "h2", "h3", "h4", "h5", "h6", "p", "li", "div")
+_TRACKED_SET = frozenset(_TRACKED)
+_NON_TEXT_TAGS = frozenset({"script", "style", "template"})
+_NON_TEXT_SELECTOR = ", ".join(sorted(_NON_TEXT_TAGS))
+_WS_RE = re.compile(r"\s+")
+_XML_DECLARATION_RE = re.compile(r"^\s*<\?xml[^>]*\?>")
+_LONG_DIGITS_RE = re.compile(r"[0-9]{20}")
+
+
+def _dumps(value: Any) -> str:
+    return orjson.dumps(value, option=orjson.OPT_INDENT_2).decode()
+
+
+def _orjson_loads(value: str) -> tuple[bool, Any]:
+    # orjson reads integers beyond 64 bits as lossy floats; any 20+ digit run might be such
+    # an integer, so those documents are left to the stdlib.
+    if _LONG_DIGITS_RE.search(value) is not None:
+        return False, None
+    try:
+        return True, orjson.loads(value)
+    except orjson.JSONDecodeError:
+        # The stdlib also accepts NaN/Infinity, lone surrogates and out-of-range floats;
+        # let it decide rather than reporting those documents as invalid.
+        return False, None
+
+
+def _loads(value: str) -> Any:
+    parsed, data = _orjson_loads(value)
+    return data if parsed else json.loads(value)
+
 
 def _normalize_whitespace(value: str) -> str:
-    return re.sub(r"\s+", " ", value).strip()
+    return _WS_RE.sub(" ", value).strip()
 
 
-def _truncate(value: str, max_chars: int) -> str:
-    if max_chars <= 0:
-        return "[truncated at 0 chars]"
-    if len(value) <= max_chars:
-        return value
-    truncated = value[:max_chars].rstrip()
-    return f"{truncated}\n[truncated at {max_chars} chars]"
+@lru_cache(maxsize=256)
+def _compile_pattern(pattern: str) -> re.Pattern[str]:
+    try:
+        return re.compile(pattern)
+    except re.error as exc:
+        raise ValueError(f"Invalid regex pattern: {exc}") from exc
 
 
-def _href_to_str(value: str | AttributeValueList | None) -> str:
-    if value is None:
-        return ""
-    if isinstance(value, list):
-        return " ".join(str(item) for item in value)
-    return str(value)
+@lru_cache(maxsize=256)
+def _css(selector: str) -> Callable[[lxml.html.HtmlElement], Any]:
+    # Translating CSS to XPath costs far more than evaluating it on a typical page.
+    path = CSSSelector(selector, translator="html").path
+    if "__lxml_internal_css:" in path:
+        # A compiled XPath that calls cssselect's extension functions (`:contains`) fails on
+        # every evaluation after its first; only the translated path is safe to reuse.
+        return partial(_xpath, path=path)
+    return etree.XPath(path)
 
 
-def _inline_text(node: PageElement) -> str:
-    if isinstance(node, NavigableString):
-        return _normalize_whitespace(str(node))
-    if not isinstance(node, Tag):
-        return ""
-    if node.name in NOISE_TAGS:
+def _xpath(root: lxml.html.HtmlElement, path: str) -> Any:
+    return root.xpath(path)
+
+
+def _parse_html(html: str) -> lxml.html.HtmlElement:
+    # lxml rejects str input carrying an XML encoding declaration; the text is already decoded.
+    source = _XML_DECLARATION_RE.sub("", html, count=1)
+    try:
+        return lxml.html.document_fromstring(source)
+    except etree.ParserError:
+        return lxml.html.document_fromstring("<html></html>")
+
+
+@dataclass
+class ParsedDoc:
+    """An HTML document parsed once and shared across extractors.
+
+    Call ``parse(html)`` once and pass the result to several extractors instead of the raw
+    string; the lxml tree is built on first use and never mutated by the extractors.
+    """
+
+    html: str
+
+    @cached_property
+    def tree(self) -> lxml.html.HtmlElement:
+        return _parse_html(self.html)
+
+    @cached_property
+    def lexbor(self) -> LexborHTMLParser:
+        return LexborHTMLParser(self.html)
+
+
+def parse(html: str) -> ParsedDoc:
+    return ParsedDoc(html)
+
+
+def _tree(doc: ParsedDoc | str) -> lxml.html.HtmlElement:
+    return doc.tree if isinstance(doc, ParsedDoc) else _parse_html(doc)
+
+
+def _lexbor_tree(doc: ParsedDoc | str) -> LexborHTMLParser:
+    return doc.lexbor if isinstance(doc, ParsedDoc) else LexborHTMLParser(doc)
+
+
+def _text_parts(node: lxml.html.HtmlElement) -> Iterator[str]:
+    # Mirrors BeautifulSoup's get_text(): comments and script/style/template bodies are skipped.
+    if node.text and node.tag not in _NON_TEXT_TAGS:
+        yield node.text
+    for child in node:
+        if isinstance(child.tag, str) and child.tag not in _NON_TEXT_TAGS:
+            yield from _text_parts(child)
+        if child.tail:
+            yield child.tail
+
+
+def _lexbor_text_parts(node: LexborNode) -> Iterator[str]:
+    # Same rules as `_text_parts`; lexbor's own text() would include script bodies.
+    for child in node.iter(include_text=True):
+        if child.is_text_node:
+            yield child.text_content or ""
+        elif child.is_element_node and child.tag not in _NON_TEXT_TAGS:
+            yield from _lexbor_text_parts(child)
+
+
+def _render_link(parts: list[str], href: str) -> str:
+    text = _normalize_whitespace(" ".join(parts))
+    if not text:
+        text = href
+    if href:
+        return f"[{text}]({href})"
+    return text
+
+
+def _inline_text(node: lxml.html.HtmlElement) -> str:
+    """Flatten a block to space-joined text, rendering anchors as ``[text](href)``.
+
+    Walks the subtree with an explicit stack and normalizes whitespace once at the end;
+    each open anchor collects its own parts so nested links render innermost first.
+    """
+    if not isinstance(node.tag, str) or node.tag in NOISE_TAGS:
         return ""
-    if node.name == "a":
-        href = _href_to_str(node.get("href")).strip()
-        text = _normalize_whitespace(" ".join(_inline_text(c) for c in node.children))
-        if not text:
-            text = href
-        if href:
-            return f"[{text}]({href})"
-        return text
-    parts = [_inline_text(child) for child in node.children]
-    return _normalize_whitespace(" ".join(part for part in parts if part))
+    buffers: list[list[str]] = [[]]
+    stack: list[tuple[lxml.html.HtmlElement, bool]] = [(node, True)]
+    while stack:
+        el, entering = stack.pop()
+        if entering:
+            tag = el.tag
+            if not isinstance(tag, str) or tag in NOISE_TAGS:
+                if el.tail:
+                    buffers[-1].append(el.tail)
+                continue
+            if tag == "a":
+                buffers.append([])
+            if el.text:
+                buffers[-1].append(el.text)
+            stack.append((el, False))
+            stack.extend((child, True) for child in reversed(el))
+            continue
+        if el.tag == "a":
+            parts = buffers.pop()
+            buffers[-1].append(_render_link(parts, (el.get("href") or "").strip()))
+        if el is not node and el.tail:
+            buffers[-1].append(el.tail)
+    return _normalize_whitespace(" ".join(buffers[0]))
+
 
+def _within_noise(node: lxml.html.HtmlElement) -> bool:
+    return node.tag in NOISE_TAGS or any(a.tag in NOISE_TAGS for a in node.iterancestors())
 
-def _clean_html(html: str, selector: str | None = None, max_chars: int = 50_000) -> str:
-    soup = BeautifulSoup(html, "lxml")
-    for tag in soup.find_all(NOISE_TAGS):
-        tag.decompose()
 
-    target: Tag | BeautifulSoup | None = soup.body or soup
+def _iter_blocks(target: lxml.html.HtmlElement) -> Iterator[lxml.html.HtmlElement]:
+    """Yield renderable blocks in document order, pruning noise subtrees.
+
+    A ``div`` is only a block when it has no tracked children. Its subtree is skipped only
+    when no tracked element sits anywhere below it; wrapper divs must still be descended into.
+    """
+    stack = list(reversed(target))
+    while stack:
+        node = stack.pop()
+        tag = node.tag
+        if not isinstance(tag, str) or tag in NOISE_TAGS:
+            continue
+        if tag == "div":
+            if not any(child.tag in _TRACKED_SET for child in node):
+                yield node
+                if next(node.iterdescendants(*_TRACKED), None) is None:
+                    continue
+        elif tag in _TRACKED_SET:
+            yield node
+        stack.extend(reversed(node))
+
+
+def _clean_html(
+    html: ParsedDoc | str, selector: str | None = None, max_chars: int = 50_000
+) -> str:
+    root = _tree(html)
+    body = root.find("body")
+    target: lxml.html.HtmlElement = body if body is not None else root
     prefix = ""
     if selector:
-        selected = soup.select_one(selector)
+        selected = next((el for el in _css(selector)(root) if not _within_noise(el)), None)
         if selected is None:
             prefix = f"[selector not found: {selector}]\n\n"
         else:
             target = selected
 
     lines: list[str] = []
-    if target is None:
-        return _truncate(prefix.strip(), max_chars=max_chars)
-
-    tracked_tags = ["h1", "h2", "h3", "h4", "h5", "h6", "p", "li", "div"]
-    tracked_tag_set = set(tracked_tags)
-    for tag in target.find_all(tracked_tags, recursive=True):
-        if not isinstance(tag, Tag):
-            continue
-        if tag.name == "div":
-            has_nested_blocks = any(
-                isinstance(child, Tag) and child.name in tracked_tag_set
-                for child in tag.children
-            )
-            if has_nested_blocks:
-                continue
-        text = _normalize_whitespace(_inline_text(tag))
+    for tag in _iter_blocks(target):
+        text = _inline_text(tag)
         if not text:
             continue
-        if tag.name in {"h1", "h2", "h3", "h4", "h5", "h6"}:
-            level = int(tag.name[1])
-            lines.append(f"{'#' * level} {text}")
-        elif tag.name == "li":
-            lines.append(f"- {text}")
+        heading_prefix = _HEADING_PREFIX.get(tag.tag)
+        if heading_prefix is not None:
+            lines.append(heading_prefix + text)
+        elif tag.tag == "li":
+            lines.append("- " + text)
         else:
             lines.append(text)
 
@@ -97,35 +250,51 @@ def _clean_html(html: str, selector: str | None = None, max_chars: int = 50_000)
     return _truncate(rendered.strip(), max_chars=max_chars)
 
 
+# urlsplit is already memoised by the stdlib, but urljoin still rebuilds the joined URL;
+# menus and footers repeat the same hrefs many times on one page.
+@lru_cache(maxsize=1024)
 def _resolve_url(base: str, href: str) -> str:
     return urljoin(base, href)
 
 
-def extract_links(
-    html: str,
-    base_url: str,
-    selector: str = "a[href]",
-    pattern: str | None = None,
-    max_results: int = 100,
-) -> str:
-    regex: re.Pattern[str] | None = None
-    if pattern:
-        try:
-            regex = re.compile(pattern)
-        except re.error as exc:
-            raise ValueError(f"Invalid regex pattern: {exc}") from exc
-
-    soup = BeautifulSoup(html, "lxml")
+def _links_lxml(
+    doc: ParsedDoc | str, base_url: str, selector: str, regex: re.Pattern[str] | None, limit: int
+) -> list[dict[str, str]]:
+    root = _tree(doc)
+    # The default selector is answered by a lazy tag walk that stops at `limit`; the href
+    # checks below already reject anchors that `[href]` would.
+    tags = root.iter("a") if selector == "a[href]" else _css(selector)(root)
     results: list[dict[str, str]] = []
-    for tag in soup.select(selector):
-        if not isinstance(tag, Tag):
+    for tag in tags:
+        href = (tag.get("href") or "").strip()
+        if not href:
+            continue
+        if regex and regex.search(href) is None:
             continue
-        href = _href_to_str(tag.get("href")).strip()
+        text = _normalize_whitespace(" ".join(_text_parts(tag)))
+        results.append(
+            {
+                "text": text,
+                "href": href,
+                "absolute_url": _resolve_url(base_url, href),
+            }
+        )
+        if len(results) >= limit:
+            break
+    return results
+
+
+def _links_lexbor(
+    doc: ParsedDoc | str, base_url: str, selector: str, regex: re.Pattern[str] | None, limit: int
+) -> list[dict[str, str]]:
+    results: list[dict[str, str]] = []
+    for node in _lexbor_tree(doc).css(selector):
+        href = (node.attributes.get("href") or "").strip()
         if not href:
             continue
         if regex and regex.search(href) is None:
             continue
-        text = _normalize_whitespace(tag.get_text(" ", strip=True))
+        text = _normalize_whitespace(" ".join(_lexbor_text_parts(node)))
         results.append(
             {
                 "text": text,
@@ -133,102 +302,198 @@ def extract_links(
                 "absolute_url": _resolve_url(base_url, href),
             }
         )
-        if len(results) >= max_results:
+        if len(results) >= limit:
             break
+    return results
+
 
-    return json.dumps(results, indent=2)
+def extract_links(
+    html: ParsedDoc | str,
+    base_url: str,
+    selector: str = "a[href]",
+    pattern: str | None = None,
+    max_results: int = 100,
+) -> str:
+    """Extract links as JSON, using selectolax's lexbor engine when it is installed."""
+    regex = _compile_pattern(pattern) if pattern else None
+    if _HAS_LEXBOR:
+        try:
+            return _dumps(_links_lexbor(html, base_url, selector, regex, max_results))
+        except SelectolaxError:
+            pass  # a selector lexbor cannot parse (e.g. `:contains`); cssselect may accept it
+    return _dumps(_links_lxml(html, base_url, selector, regex, max_results))
 
 
 # --- Metadata extraction ---
 
-def extract_metadata(html: str) -> str:
-    """Extract JSON-LD, Open Graph, Twitter Card, and standard meta tags as structured JSON."""
-    soup = BeautifulSoup(html, "lxml")
-
-    json_ld: list[Any] = []
-    for tag in soup.find_all("script", type="application/ld+json"):
-        raw = tag.string or ""
+def _add_meta(
+    attr: Callable[[str], str | None],
+    opengraph: dict[str, str],
+    twitter: dict[str, str],
+    meta: dict[str, str],
+) -> None:
+    prop = attr("property") or ""
+    name = attr("name") or ""
+    content = attr("content")
+    if prop.startswith("og:"):
+        opengraph[prop[3:]] = content or ""
+    if name.startswith("twitter:"):
+        twitter[name[8:]] = content or ""
+    raw_name = name or attr("http-equiv") or ""
+    if raw_name and content and not raw_name.startswith(("og:", "twitter:")):
+        meta[raw_name] = content
+
+
+def _add_json_ld(text: str, json_ld: list[Any]) -> bool:
+    # Returns False when the block needed the stdlib decoder: its wide integers or NaN
+    # values then have to be written back out by the stdlib too.
+    parsed, data = _orjson_loads(text)
+    if not parsed:
         try:
-            json_ld.append(json.loads(raw))
-        except (json.JSONDecodeError, ValueError):
-            pass
+            data = json.loads(text)
+        except ValueError:
+            return True
+    json_ld.append(data)
+    return parsed
 
-    opengraph: dict[str, str] = {}
-    for tag in soup.find_all("meta", attrs={"property": True}):
-        prop = str(tag.get("property", ""))
-        if prop.startswith("og:"):
-            opengraph[prop[3:]] = str(tag.get("content", ""))
 
+def _metadata_lxml(doc: ParsedDoc | str) -> tuple[dict[str, Any], bool]:
+    json_ld: list[Any] = []
+    opengraph: dict[str, str] = {}
     twitter: dict[str, str] = {}
-    for tag in soup.find_all("meta", attrs={"name": True}):
-        name = str(tag.get("name", ""))
-        if name.startswith("twitter:"):
-            twitter[name[8:]] = str(tag.get("content", ""))
+    meta: dict[str, str] = {}
+    exact = True
+    # One walk over the tree serves every bucket.
+    for tag in _tree(doc).iter("script", "meta"):
+        if tag.tag == "meta":
+            _add_meta(tag.get, opengraph, twitter, meta)
+        elif tag.get("type") == "application/ld+json":
+            exact &= _add_json_ld(tag.text or "", json_ld)
+
+    data = {"json_ld": json_ld, "opengraph": opengraph, "twitter": twitter, "meta": meta}
+    return data, exact
 
+
+def _metadata_lexbor(doc: ParsedDoc | str) -> tuple[dict[str, Any], bool]:
+    json_ld: list[Any] = []
+    opengraph: dict[str, str] = {}
+    twitter: dict[str, str] = {}
     meta: dict[str, str] = {}
-    for tag in soup.find_all("meta"):
-        raw_name = tag.get("name") or tag.get("http-equiv")
-        content = tag.get("content")
-        if not raw_name or not content:
-            continue
-        name_str = str(raw_name)
-        if name_str.startswith(("og:", "twitter:")):
-            continue
-        meta[name_str] = str(content)
+    exact = True
+    for node in _lexbor_tree(doc).css("script, meta"):
+        if node.tag == "meta":
+            _add_meta(node.attributes.get, opengraph, twitter, meta)
+        elif node.attributes.get("type") == "application/ld+json":
+            exact &= _add_json_ld(node.text(deep=True), json_ld)
 
-    return json.dumps(
-        {"json_ld": json_ld, "opengraph": opengraph, "twitter": twitter, "meta": meta},
-        indent=2,
-    )
+    data = {"json_ld": json_ld, "opengraph": opengraph, "twitter": twitter, "meta": meta}
+    return data, exact
+
+
+def extract_metadata(html: ParsedDoc | str) -> str:
+    """Extract JSON-LD, Open Graph, Twitter Card, and standard meta tags as structured JSON."""
+    data, exact = _metadata_lexbor(html) if _HAS_LEXBOR else _metadata_lxml(html)
+    if exact:
+        return _dumps(data)
+    return json.dumps(data, indent=2, ensure_ascii=False)
 
 
 # --- Table extraction ---
 
-def extract_tables(html: str, selector: str | None = None) -> str:
-    """Extract <table> elements from HTML as a list of {headers, rows} objects."""
-    soup = BeautifulSoup(html, "lxml")
-    root: Tag | BeautifulSoup = soup
+def _plain_text(node: lxml.html.HtmlElement) -> str:
+    return etree.tostring(node, method="text", encoding=str, with_tail=False)
+
+
+def _cell_texts(row: lxml.html.HtmlElement, plain: bool) -> list[str]:
+    # `plain` tables have no script/style/template bodies to skip, so the text serialiser in
+    # libxml2 can replace the per-node Python walk.
+    return [
+        _normalize_whitespace(_plain_text(cell) if plain else "".join(_text_parts(cell)))
+        for cell in row.iterdescendants("th", "td")
+    ]
+
+
+def _lexbor_cell_texts(row: LexborNode, plain: bool) -> list[str]:
+    return [
+        _normalize_whitespace(cell.text(deep=True) if plain else "".join(_lexbor_text_parts(cell)))
+        for cell in row.css("th, td")
+    ]
+
+
+def _tables_lxml(doc: ParsedDoc | str, selector: str | None) -> list[dict[str, Any]]:
+    root = _tree(doc)
     if selector:
-        found = soup.select_one(selector)
+        found = next(iter(_css(selector)(root)), None)
         if found is not None:
             root = found
 
-    table_els: list[Any]
-    if isinstance(root, Tag) and root.name == "table":
-        table_els = [root]
-    else:
-        table_els = root.find_all("table")
+    table_els = [root] if root.tag == "table" else list(root.iter("table"))
 
     results: list[dict[str, Any]] = []
     for table in table_els:
-        if not isinstance(table, Tag):
-            continue
+        plain = next(table.iter(*_NON_TEXT_TAGS), None) is None
         headers: list[str] = []
 
-        thead = table.find("thead")
-        if isinstance(thead, Tag):
-            header_tr = thead.find("tr")
-            if isinstance(header_tr, Tag):
-                headers = [
-                    _normalize_whitespace(cell.get_text())
-                    for cell in header_tr.find_all(["th", "td"])
-                ]
+        thead = next(table.iterdescendants("thead"), None)
+        if thead is not None:
+            header_tr = next(thead.iterdescendants("tr"), None)
+            if header_tr is not None:
+                headers = _cell_texts(header_tr, plain)
 
         if not headers:
-            first_tr = table.find("tr")
-            if isinstance(first_tr, Tag) and first_tr.find("th"):
-                headers = [
-                    _normalize_whitespace(cell.get_text())
-                    for cell in first_tr.find_all(["th", "td"])
-                ]
-
-        tbody = table.find("tbody")
-        row_source: Tag = tbody if isinstance(tbody, Tag) else table
+            first_tr = next(table.iterdescendants("tr"), None)
+            if first_tr is not None and next(first_tr.iterdescendants("th"), None) is not None:
+                headers = _cell_texts(first_tr, plain)
+
+        tbody = next(table.iterdescendants("tbody"), None)
+        row_source = tbody if tbody is not None else table
         rows: list[list[str]] = []
-        for tr in row_source.find_all("tr"):
-            if not isinstance(tr, Tag):
-                continue
-            cells = [_normalize_whitespace(td.get_text()) for td in tr.find_all(["td", "th"])]
+        for tr in row_source.iterdescendants("tr"):
+            cells = _cell_texts(tr, plain)
+            if any(cells):
+                rows.append(cells)
+
+        if headers and rows and rows[0] == headers:
+            rows = rows[1:]
+
+        results.append({"headers": headers, "rows": rows})
+
+    return results
+
+
+def _tables_lexbor(doc: ParsedDoc | str, selector: str | None) -> list[dict[str, Any]]:
+    tree = _lexbor_tree(doc)
+    root = tree.root
+    if selector:
+        found = tree.css_first(selector)
+        if found is not None:
+            root = found
+    if root is None:
+        return []
+
+    table_nodes = [root] if root.tag == "table" else root.css("table")
+
+    results: list[dict[str, Any]] = []
+    for table in table_nodes:
+        plain = table.css_first(_NON_TEXT_SELECTOR) is None
+        headers: list[str] = []
+
+        thead = table.css_first("thead")
+        if thead is not None:
+            header_tr = thead.css_first("tr")
+            if header_tr is not None:
+                headers = _lexbor_cell_texts(header_tr, plain)
+
+        if not headers:
+            first_tr = table.css_first("tr")
+            if first_tr is not None and first_tr.css_first("th") is not None:
+                headers = _lexbor_cell_texts(first_tr, plain)
+
+        tbody = table.css_first("tbody")
+        row_source = tbody if tbody is not None else table
+        rows: list[list[str]] = []
+        for tr in row_source.css("tr"):
+            cells = _lexbor_cell_texts(tr, plain)
             if any(cells):
                 rows.append(cells)
 
@@ -237,7 +502,17 @@ def extract_tables(html: str, selector: str | None = None) -> str:
 
         results.append({"headers": headers, "rows": rows})
 
-    return json.dumps(results, indent=2)
+    return results
+
+
+def extract_tables(html: ParsedDoc | str, selector: str | None = None) -> str:
+    """Extract <table> elements from HTML as a list of {headers, rows} objects."""
+    if _HAS_LEXBOR:
+        try:
+            return _dumps(_tables_lexbor(html, selector))
+        except SelectolaxError:
+            pass  # same selector fallback as `extract_links`
+    return _dumps(_tables_lxml(html, selector))
 
 
 # --- Feed parsing (RSS 2.0 / Atom) ---
@@ -245,57 +520,169 @@ def extract_tables(html: str, selector: str | None = None) -> str:
 _ATOM_NS = "http://www.w3.org/2005/Atom"
 
 
-def _xml_text(el: ET.Element | None) -> str:
+def _xml_text(el: etree._Element | None) -> str:
     if el is None:
         return ""
     return (el.text or "").strip()
 
 
+def _rss_item(item_el: etree._Element) -> dict[str, str]:
+    return {
+        "title": _xml_text(item_el.find("title")),
+        "link": _xml_text(item_el.find("link")),
+        "published": _xml_text(item_el.find("pubDate")),
+        "summary": _xml_text(item_el.find("description")),
+    }
+
+
+def _atom_entry(entry: etree._Element, pfx: str) -> dict[str, str]:
+    link_entry = entry.find(f"{pfx}link")
+    link_href = (link_entry.get("href") or "") if link_entry is not None else ""
+    summary_el = entry.find(f"{pfx}summary")
+    if summary_el is None:
+        summary_el = entry.find(f"{pfx}content")
+    pub_el = entry.find(f"{pfx}updated")
+    if pub_el is None:
+        pub_el = entry.find(f"{pfx}published")
+    return {
+        "title": _xml_text(entry.find(f"{pfx}title")),
+        "link": link_href,
+        "published": _xml_text(pub_el),
+        "summary": _xml_text(summary_el),
+    }
+
+
 def parse_feed(xml_text: str, max_items: int = 50) -> str:
-    """Parse an RSS 2.0 or Atom feed into structured JSON."""
+    """Parse an RSS 2.0 or Atom feed into structured JSON.
+
+    The document is streamed with ``iterparse``: each item is discarded once read, and
+    parsing stops as soon as ``max_items`` items and the feed title/link have been seen.
+    """
+    # The text is already decoded, so any declared encoding is overridden to match the bytes.
+    source = BytesIO(xml_text.strip().encode("utf-8"))
+    events = etree.iterparse(
+        source, events=("start", "end"), encoding="utf-8", resolve_entities=False
+    )
+
+    feed_title: str | None = None
+    feed_link: str | None = None
+    items: list[dict[str, str]] = []
+
     try:
-        root = ET.fromstring(xml_text.strip())
-    except ET.ParseError as exc:
+        _, root = next(events)
+        tag = str(root.tag)
+        if tag == "rss" or tag.endswith("}rss"):
+            is_atom = False
+            pfx = ""
+            item_tag = "item"
+            container: etree._Element | None = None
+        elif tag == f"{{{_ATOM_NS}}}feed" or tag == "feed":
+            is_atom = True
+            pfx = f"{{{_ATOM_NS}}}" if tag.startswith("{") else ""
+            item_tag = f"{pfx}entry"
+            container = root
+        else:
+            raise ValueError(f"Unrecognized feed format: root tag '{tag}'")
+
+        for event, elem in events:
+            if event == "start":
+                # RSS items live in the first <channel> directly under the root.
+                if container is None and elem.tag == "channel" and elem.getparent() is root:
+                    container = elem
+                continue
+            if container is None or elem.getparent() is not container:
+                continue
+            if elem.tag == item_tag:
+                if len(items) < max_items:
+                    items.append(_atom_entry(elem, pfx) if is_atom else _rss_item(elem))
+                elem.clear()
+                while elem.getprevious() is not None:
+                    del container[0]
+                if len(items) >= max_items and feed_title is not None and feed_link is not None:
+                    break
+            elif elem.tag == f"{pfx}title" and feed_title is None:
+                feed_title = _xml_text(elem)
+            elif elem.tag == f"{pfx}link" and feed_link is None:
+                feed_link = (elem.get("href") or "") if is_atom else _xml_text(elem)
+    except etree.XMLSyntaxError as exc:
         raise ValueError(f"Invalid XML feed: {exc}") from exc
 
-    feed_title = ""
-    feed_link = ""
-    items: list[dict[str, str]] = []
+    return _dumps(
+        {"feed_title": feed_title or "", "feed_link": feed_link or "", "items": items}
+    )
+
+
+# --- Async entry points ---
+
+# Parsing is CPU-bound; a dedicated, CPU-sized pool keeps it off the event loop without
+# letting a burst of large documents thrash the GIL.
+_PARSER_POOL = ThreadPoolExecutor(
+    max_workers=os.cpu_count() or 1, thread_name_prefix="stealth-fetch-parser"
+)
+
+
+async def _run_in_pool(func: Callable[..., str], /, *args: Any, **kwargs: Any) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_PARSER_POOL, partial(func, *args, **kwargs))
+
+
+CLEAN_CACHE_SIZE = 64
+# Rendered text for recently cleaned documents, keyed by a digest of the HTML so the cache
+# never pins full page bodies. Only touched from the event loop thread.
+_CLEAN_CACHE: OrderedDict[tuple[bytes, str | None, int], str] = OrderedDict()
+
+
+async def aclean_html(
+    html: ParsedDoc | str, selector: str | None = None, max_chars: int = 50_000
+) -> str:
+    """Async `_clean_html`, run on the parser pool so network I/O keeps progressing.
+
+    Results for string input are memoised, so cleaning an unchanged page again (a
+    revalidated fetch, say) skips both the parse and the pool hop.
+    """
+    if not isinstance(html, str):
+        return await _run_in_pool(_clean_html, html, selector=selector, max_chars=max_chars)
+    digest = hashlib.blake2b(html.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+    key = (digest, selector, max_chars)
+    cached = _CLEAN_CACHE.get(key)
+    if cached is not None:
+        _CLEAN_CACHE.move_to_end(key)
+        return cached
+    text = await _run_in_pool(_clean_html, html, selector=selector, max_chars=max_chars)
+    _CLEAN_CACHE[key] = text
+    if len(_CLEAN_CACHE) > CLEAN_CACHE_SIZE:
+        _CLEAN_CACHE.popitem(last=False)
+    return text
+
+
+async def aextract_links(
+    html: ParsedDoc | str,
+    base_url: str,
+    selector: str = "a[href]",
+    pattern: str | None = None,
+    max_results: int = 100,
+) -> str:
+    """Async `extract_links`, run on the parser pool."""
+    return await _run_in_pool(
+        extract_links,
+        html,
+        base_url,
+        selector=selector,
+        pattern=pattern,
+        max_results=max_results,
+    )
+
+
+async def aextract_metadata(html: ParsedDoc | str) -> str:
+    """Async `extract_metadata`, run on the parser pool."""
+    return await _run_in_pool(extract_metadata, html)
+
+
+async def aextract_tables(html: ParsedDoc | str, selector: str | None = None) -> str:
+    """Async `extract_tables`, run on the parser pool."""
+    return await _run_in_pool(extract_tables, html, selector=selector)
+
 
-    tag = root.tag
-    if tag == "rss" or tag.endswith("}rss"):
-        channel = root.find("channel")
-        if channel is not None:
-            feed_title = _xml_text(channel.find("title"))
-            feed_link = _xml_text(channel.find("link"))
-            for item_el in channel.findall("item")[:max_items]:
-                items.append({
-                    "title": _xml_text(item_el.find("title")),
-                    "link": _xml_text(item_el.find("link")),
-                    "published": _xml_text(item_el.find("pubDate")),
-                    "summary": _xml_text(item_el.find("description")),
-                })
-    elif tag == f"{{{_ATOM_NS}}}feed" or tag == "feed":
-        pfx = f"{{{_ATOM_NS}}}" if tag.startswith("{") else ""
-        feed_title = _xml_text(root.find(f"{pfx}title"))
-        link_el = root.find(f"{pfx}link")
-        feed_link = (link_el.get("href") or "") if link_el is not None else ""
-        for entry in root.findall(f"{pfx}entry")[:max_items]:
-            link_entry = entry.find(f"{pfx}link")
-            link_href = (link_entry.get("href") or "") if link_entry is not None else ""
-            summary_el = entry.find(f"{pfx}summary")
-            if summary_el is None:
-                summary_el = entry.find(f"{pfx}content")
-            pub_el = entry.find(f"{pfx}updated")
-            if pub_el is None:
-                pub_el = entry.find(f"{pfx}published")
-            items.append({
-                "title": _xml_text(entry.find(f"{pfx}title")),
-                "link": link_href,
-                "published": _xml_text(pub_el),
-                "summary": _xml_text(summary_el),
-            })
-    else:
-        raise ValueError(f"Unrecognized feed format: root tag '{tag}'")
-
-    return json.dumps({"feed_title": feed_title, "feed_link": feed_link, "items": items}, indent=2)
+async def aparse_feed(xml_text: str, max_items: int = 50) -> str:
+    """Async `parse_feed`, run on the parser pool."""
+    return await _run_in_pool(parse_feed, xml_text, max_items=max_items)
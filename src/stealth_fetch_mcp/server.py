@@ -3,9 +3,13 @@ from __future__ import annotations
 import asyncio
 import json
 from collections.abc import AsyncIterator
-from contextlib import asynccontextmanager
+from contextlib import AbstractAsyncContextManager, asynccontextmanager, nullcontext
 from dataclasses import dataclass
+from functools import cache
 from typing import Any, Literal
+from urllib.parse import urlsplit, urlunsplit
+
+import orjson
 from curl_cffi.requests import AsyncSession
 from curl_cffi.requests.impersonate import BrowserTypeLiteral
 from mcp.server.fastmcp import Context, FastMCP
@@ -20,13 +24,20 @@ from stealth_fetch_mcp.client import (
     FetchError,
     _create_session,
     _fetch,
+    _get_session,
+    _handle_error,
+    _truncate,
+    aclose,
 )
 from stealth_fetch_mcp.parser import (
-    _clean_html,
-    extract_links,
-    extract_metadata,
-    extract_tables,
-    parse_feed,
+    _compile_pattern,
+    _loads,
+    _orjson_loads,
+    aclean_html,
+    aextract_links,
+    aextract_metadata,
+    aextract_tables,
+    aparse_feed,
 )
 
 DEFAULT_TEXT_MAX_CHARS = 50_000
@@ -70,12 +81,15 @@ avoid follow-up calls to verify or re-fetch the same URL.\
 """
 
 
-def _truncate(value: str, max_chars: int) -> str:
-    if max_chars <= 0:
-        return "[truncated at 0 chars]"
-    if len(value) <= max_chars:
-        return value
-    return f"{value[:max_chars].rstrip()}\n[truncated at {max_chars} chars]"
+def _dumps(value: Any) -> str:
+    return orjson.dumps(value, option=orjson.OPT_INDENT_2).decode()
+
+
+def _pretty_json(value: str) -> str:
+    parsed, data = _orjson_loads(value)
+    if parsed:
+        return _dumps(data)
+    return json.dumps(json.loads(value), indent=2, ensure_ascii=False)
 
 
 class _ConfigModel(BaseModel):
@@ -86,7 +100,8 @@ class _BaseInputModel(_ConfigModel):
     @field_validator("url", check_fields=False)
     @classmethod
     def _validate_http_url(cls, value: str) -> str:
-        if not (value.startswith("http://") or value.startswith("https://")):
+        # Schemes are case-insensitive; only the eight characters that can hold one are folded.
+        if not value[:8].lower().startswith(("http://", "https://")):
             raise ValueError("URL must start with http:// or https://")
         return value
 
@@ -423,6 +438,10 @@ class StealthFetchJsonInput(_BaseInputModel):
         gt=0,
         le=1_000_000,
     )
+    raw: bool = Field(
+        default=False,
+        description="Return the response body as received instead of pretty-printing it.",
+    )
 
 
 class StealthExtractLinksInput(_BaseInputModel):
@@ -461,6 +480,14 @@ class StealthExtractLinksInput(_BaseInputModel):
         le=1_000_000,
     )
 
+    @field_validator("pattern")
+    @classmethod
+    def _validate_pattern(cls, value: str | None) -> str | None:
+        # Rejects bad patterns before the fetch; the compiled form is cached for extract_links.
+        if value:
+            _compile_pattern(value)
+        return value
+
 
 class StealthFetchHeadersInput(_BaseInputModel):
     url: str = Field(..., description="Target URL to inspect.")
@@ -589,6 +616,12 @@ class StealthFetchBulkInput(_ConfigModel):
         le=20,
         description="Maximum number of concurrent requests.",
     )
+    max_per_host: int = Field(
+        default=4,
+        ge=1,
+        le=20,
+        description="Maximum number of concurrent requests to a single host.",
+    )
     delay: float = Field(
         default=0.0,
         ge=0.0,
@@ -613,16 +646,33 @@ class StealthFetchBulkInput(_ConfigModel):
     )
 
 
+@cache
+def _dump_names(model: type[_ConfigModel]) -> dict[str, str]:
+    return {
+        name: field.serialization_alias or field.alias or name
+        for name, field in model.model_fields.items()
+    }
+
+
 def _options_to_dict(options: _ConfigModel | None) -> dict[str, Any]:
+    # Equivalent to model_dump(exclude_none=True, by_alias=True), but only visits the fields
+    # the caller actually set; every options field defaults to None.
     if options is None:
         return {}
-    data = options.model_dump(exclude_none=True, by_alias=True)
-    curl_options = data.pop("curl_options", None)
-    if curl_options:
-        data["curl_options"] = {
-            entry["option"]: entry["value"]
-            for entry in curl_options
-        }
+    names = _dump_names(type(options))
+    values = options.__dict__
+    data: dict[str, Any] = {}
+    for name in options.model_fields_set:
+        value = values[name]
+        if value is None:
+            continue
+        if name == "curl_options":
+            if value:
+                data["curl_options"] = {entry.option: entry.value for entry in value}
+            continue
+        if isinstance(value, _ConfigModel):
+            value = _options_to_dict(value)
+        data[names[name]] = value
     return data
 
 
@@ -630,6 +680,9 @@ def _merge_request_options(
     request_options: RequestOptionsInput | None,
     **overrides: Any,
 ) -> dict[str, Any] | None:
+    if request_options is None or not request_options.model_fields_set:
+        # The common case: every tool passes only its own top-level overrides.
+        return {key: value for key, value in overrides.items() if value is not None} or None
     merged = _options_to_dict(request_options)
     for key, value in overrides.items():
         if value is not None:
@@ -637,18 +690,20 @@ def _merge_request_options(
     return merged or None
 
 
-@asynccontextmanager
-async def _session_scope(
+def _session_scope(
     shared_session: AsyncSession,
     session_options: SessionOptionsInput | None,
-) -> AsyncIterator[AsyncSession]:
-    if session_options is None:
-        yield shared_session
-        return
+) -> AbstractAsyncContextManager[AsyncSession]:
+    """Return the session a tool call should use, as an ``async with`` target.
 
+    A plain branch rather than a generator-based context manager: the shared session is
+    wrapped in ``nullcontext`` and an ephemeral ``AsyncSession`` is its own context manager.
+    """
+    # An options object with nothing set would only rebuild the shared session's defaults.
     options = _options_to_dict(session_options)
-    async with _create_session(session_options=options) as ephemeral_session:
-        yield ephemeral_session
+    if not options:
+        return nullcontext(shared_session)
+    return _create_session(session_options=options)
 
 
 @dataclass
@@ -656,10 +711,22 @@ class AppContext:
     session: AsyncSession
 
 
+# The SDK enters the lifespan once per client session (and per request when stateless), so
+# the pooled session is closed only when the last overlapping lifespan exits.
+_ACTIVE_LIFESPANS = 0
+
+
 @asynccontextmanager
 async def app_lifespan(_: FastMCP[AppContext]) -> AsyncIterator[AppContext]:
-    async with _create_session() as session:
+    global _ACTIVE_LIFESPANS
+    _ACTIVE_LIFESPANS += 1
+    try:
+        session = await _get_session()
         yield AppContext(session=session)
+    finally:
+        _ACTIVE_LIFESPANS -= 1
+        if not _ACTIVE_LIFESPANS:
+            await aclose()
 
 
 mcp = FastMCP(
@@ -701,14 +768,14 @@ async def _stealth_fetch_text_impl(params: StealthFetchTextInput, session: Async
             request_options=request_options,
             max_chars=max(params.max_chars * 2, DEFAULT_MAX_CHARS),
         )
-    return _clean_html(result.text, selector=params.selector, max_chars=params.max_chars)
+    return await aclean_html(result.text, selector=params.selector, max_chars=params.max_chars)
 
 
 async def _stealth_fetch_json_impl(params: StealthFetchJsonInput, session: AsyncSession) -> str:
     parsed_body: Any | None = None
     if params.method == "POST" and params.body:
         try:
-            parsed_body = json.loads(params.body)
+            parsed_body = _loads(params.body)
         except json.JSONDecodeError as exc:
             raise FetchError(f"Invalid JSON body for POST request: {exc}") from exc
 
@@ -724,11 +791,17 @@ async def _stealth_fetch_json_impl(params: StealthFetchJsonInput, session: Async
             method=params.method,
             body=parsed_body,
             request_options=request_options,
-            max_chars=max(params.max_chars * 2, DEFAULT_MAX_CHARS),
+            # Pretty-printing adds whitespace, so the re-indented path reads extra up front.
+            max_chars=(
+                params.max_chars if params.raw else max(params.max_chars * 2, DEFAULT_MAX_CHARS)
+            ),
         )
 
+    if params.raw:
+        return result.text
+
     try:
-        pretty = json.dumps(json.loads(result.text), indent=2)
+        pretty = _pretty_json(result.text)
     except json.JSONDecodeError:
         warning = "Warning: response was not valid JSON; returning raw content."
         pretty = f"{warning}\n{result.text}"
@@ -751,7 +824,7 @@ async def _stealth_extract_links_impl(
             request_options=request_options,
             max_chars=DEFAULT_MAX_CHARS,
         )
-    links_json = extract_links(
+    links_json = await aextract_links(
         html=result.text,
         base_url=params.url,
         selector=params.selector,
@@ -780,9 +853,8 @@ async def _stealth_fetch_headers_impl(
             request_options=request_options,
             max_chars=1,
         )
-    return json.dumps(
-        {"status_code": result.status_code, "final_url": result.final_url, "headers": result.headers},
-        indent=2,
+    return _dumps(
+        {"status_code": result.status_code, "final_url": result.final_url, "headers": result.headers}
     )
 
 
@@ -802,7 +874,7 @@ async def _stealth_extract_metadata_impl(
             request_options=request_options,
             max_chars=DEFAULT_MAX_CHARS,
         )
-    return _truncate(extract_metadata(result.text), params.max_chars)
+    return _truncate(await aextract_metadata(result.text), params.max_chars)
 
 
 async def _stealth_extract_tables_impl(
@@ -821,7 +893,8 @@ async def _stealth_extract_tables_impl(
             request_options=request_options,
             max_chars=DEFAULT_MAX_CHARS,
         )
-    return _truncate(extract_tables(result.text, selector=params.selector), params.max_chars)
+    tables_json = await aextract_tables(result.text, selector=params.selector)
+    return _truncate(tables_json, params.max_chars)
 
 
 async def _stealth_fetch_feed_impl(
@@ -841,27 +914,43 @@ async def _stealth_fetch_feed_impl(
             max_chars=DEFAULT_MAX_CHARS,
         )
     try:
-        parsed = parse_feed(result.text, max_items=params.max_items)
+        parsed = await aparse_feed(result.text, max_items=params.max_items)
     except ValueError as exc:
         raise FetchError(str(exc)) from exc
     return _truncate(parsed, params.max_chars)
 
 
+def _canonical_url(url: str) -> str:
+    # Fragments never reach the server, and scheme and host are case-insensitive; userinfo,
+    # path and query are not, so they are kept verbatim.
+    parts = urlsplit(url)
+    userinfo, at, host = parts.netloc.rpartition("@")
+    netloc = f"{userinfo}{at}{host.lower()}"
+    return urlunsplit((parts.scheme.lower(), netloc, parts.path, parts.query, ""))
+
+
 async def _stealth_fetch_bulk_impl(
     params: StealthFetchBulkInput,
     session: AsyncSession,
 ) -> str:
     semaphore = asyncio.Semaphore(params.max_concurrency)
+    host_semaphores: dict[str, asyncio.Semaphore] = {}
+    # Identical for every URL; `_fetch` copies it before applying anything per request.
+    request_options = {"impersonate": params.impersonate, "timeout": params.timeout}
+
+    # Repeated URLs are fetched once and their result is reported at every position.
+    canonical_urls = [_canonical_url(entry.url) for entry in params.urls]
+    unique_urls = list(dict.fromkeys(canonical_urls))
 
     async def _fetch_one(url: str) -> dict[str, Any]:
-        async with semaphore:
+        host = urlsplit(url).netloc
+        host_semaphore = host_semaphores.get(host)
+        if host_semaphore is None:
+            host_semaphore = host_semaphores[host] = asyncio.Semaphore(params.max_per_host)
+        # Wait for the host slot first so a busy host never parks global slots.
+        async with host_semaphore, semaphore:
             if params.delay > 0:
                 await asyncio.sleep(params.delay)
-            request_options = _merge_request_options(
-                None,
-                impersonate=params.impersonate,
-                timeout=params.timeout,
-            )
             try:
                 result = await _fetch(
                     session=active_session,
@@ -879,10 +968,22 @@ async def _stealth_fetch_bulk_impl(
                 }
             except FetchError as exc:
                 return {"url": url, "status": "error", "error": str(exc)}
+            except Exception as exc:  # noqa: BLE001
+                # Reported per URL so one bad entry neither cancels its siblings nor surfaces
+                # from the TaskGroup as an ExceptionGroup.
+                return {"url": url, "status": "error", "error": _handle_error(exc)}
 
-    async with _session_scope(session, params.session_options) as active_session:
-        results = await asyncio.gather(*[_fetch_one(entry.url) for entry in params.urls])
-    return json.dumps(list(results), indent=2)
+    async with (
+        _session_scope(session, params.session_options) as active_session,
+        asyncio.TaskGroup() as group,
+    ):
+        tasks = {url: group.create_task(_fetch_one(url)) for url in unique_urls}
+    return _dumps(
+        [
+            {**tasks[url].result(), "url": entry.url}
+            for url, entry in zip(canonical_urls, params.urls, strict=True)
+        ]
+    )
 
 
 @mcp.tool(name="stealth_fetch_page", annotations=READONLY_TOOL_ANNOTATIONS)
@@ -1017,6 +1118,15 @@ async def stealth_fetch_bulk(
     return await _stealth_fetch_bulk_impl(params, ctx.request_context.lifespan_context.session)
 
 
+def _install_uvloop() -> None:
+    # Optional (the `fast` extra); anyio's asyncio runner builds its loop from the policy.
+    try:
+        import uvloop
+    except ImportError:
+        return
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
+
 def main() -> None:
     import signal
 
@@ -1024,6 +1134,7 @@ def main() -> None:
         raise SystemExit(0)
 
     signal.signal(signal.SIGTERM, _handle_sigterm)
+    _install_uvloop()
     mcp.run()
 
 
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable, Mapping
+
+import pytest
+
+try:
+    import uvloop
+except ImportError:  # optional (the `fast` extra); the stock loop covers everything
+    _HAS_UVLOOP = False
+else:
+    _HAS_UVLOOP = True
+
+try:
+    from pytest_asyncio.plugin import PytestAsyncioSpecs
+except ImportError:  # pytest-asyncio < 1.4 (the locked 1.3.0) has no loop-factory hook
+    _HAS_LOOP_FACTORIES = False
+else:
+    _HAS_LOOP_FACTORIES = hasattr(PytestAsyncioSpecs, "pytest_asyncio_loop_factories")
+
+# Run the async tests on the same loop `main()` installs when uvloop is available.
+if _HAS_UVLOOP and _HAS_LOOP_FACTORIES:
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_asyncio_loop_factories(
+        config: pytest.Config, item: pytest.Item
+    ) -> Mapping[str, Callable[[], asyncio.AbstractEventLoop]]:
+        return {"uvloop": uvloop.new_event_loop}
+
+elif _HAS_UVLOOP:
+    # pytest-asyncio < 1.4 has no loop-factory hook; the policy fixture is its equivalent.
+    @pytest.fixture(scope="session")
+    def event_loop_policy() -> asyncio.AbstractEventLoopPolicy:
+        return uvloop.EventLoopPolicy()
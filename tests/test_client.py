@@ -6,11 +6,21 @@ import time
 from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
 import pytest
+from curl_cffi.const import CurlOpt
 
-from stealth_fetch_mcp.client import FetchError, _create_session, _fetch
+from stealth_fetch_mcp.client import (
+    FetchError,
+    _create_session,
+    _fetch,
+    _get_session,
+    _to_curl_option_key,
+    aclose,
+)
 
 
 class _TestHandler(BaseHTTPRequestHandler):
+    not_modified = 0
+
     def log_message(self, format: str, *args: object) -> None:  # noqa: A003
         return
 
@@ -46,17 +56,55 @@ class _TestHandler(BaseHTTPRequestHandler):
             self.end_headers()
             self.wfile.write(("x" * 200).encode("utf-8"))
             return
+        if self.path == "/huge":
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; charset=utf-8")
+            self.end_headers()
+            try:
+                for _ in range(512):
+                    self.wfile.write(b"y" * 65_536)
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+            return
+        if self.path == "/latin1":
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; charset=iso-8859-1")
+            self.end_headers()
+            self.wfile.write("caf\u00e9 cr\u00e8me".encode("iso-8859-1"))
+            return
+        if self.path == "/multibyte":
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; charset=utf-8")
+            self.end_headers()
+            self.wfile.write(("\u00e9" * 100_000).encode("utf-8"))
+            return
         if self.path.startswith("/echo-path"):
             self.send_response(200)
             self.send_header("Content-Type", "text/plain; charset=utf-8")
             self.end_headers()
             self.wfile.write(self.path.encode("utf-8"))
             return
+        if self.path == "/etag":
+            if self.headers.get("If-None-Match") == '"v1"':
+                type(self).not_modified += 1
+                self.send_response(304)
+                self.send_header("Cache-Control", "max-age=60")
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; charset=utf-8")
+            self.send_header("ETag", '"v1"')
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Set-Cookie", "visit=1")
+            self.end_headers()
+            self.wfile.write(b"cached body")
+            return
         if self.path == "/headers":
             body = json.dumps(
                 {
                     "referer": self.headers.get("Referer"),
                     "user_agent": self.headers.get("User-Agent"),
+                    "accept_encoding": self.headers.get("Accept-Encoding"),
                 }
             )
             self.send_response(200)
@@ -81,7 +129,8 @@ class _TestHandler(BaseHTTPRequestHandler):
         self.end_headers()
 
 
-@pytest.fixture()
+# One server per module: handlers are stateless apart from counters tests reset first.
+@pytest.fixture(scope="module")
 def test_server_url() -> str:
     server = ThreadingHTTPServer(("127.0.0.1", 0), _TestHandler)
     thread = threading.Thread(target=server.serve_forever, daemon=True)
@@ -100,6 +149,7 @@ async def test_create_session_defaults() -> None:
     async with _create_session() as session:
         assert session.impersonate == "chrome"
         assert session.allow_redirects is True
+        assert session.max_clients == 20
 
 
 @pytest.mark.asyncio
@@ -111,8 +161,10 @@ async def test_create_session_with_extended_options() -> None:
             "max_redirects": 5,
             "http_version": "v2",
             "default_headers": False,
+            "max_clients": 3,
         }
     ) as session:
+        assert session.max_clients == 3
         assert session.allow_redirects is False
         assert session.verify is False
         assert session.max_redirects == 5
@@ -120,6 +172,62 @@ async def test_create_session_with_extended_options() -> None:
         assert session.default_headers is False
 
 
+def test_to_curl_option_key_accepts_names_aliases_and_numbers() -> None:
+    assert _to_curl_option_key("TIMEOUT_MS") is CurlOpt.TIMEOUT_MS
+    assert _to_curl_option_key(" CurlOpt.TIMEOUT_MS ") is CurlOpt.TIMEOUT_MS
+    assert _to_curl_option_key("WRITEHEADER") is CurlOpt.WRITEHEADER
+    assert _to_curl_option_key(str(CurlOpt.TIMEOUT_MS.value)) is CurlOpt.TIMEOUT_MS
+    assert _to_curl_option_key(CurlOpt.TIMEOUT_MS.value) is CurlOpt.TIMEOUT_MS
+    with pytest.raises(ValueError, match="Unsupported curl option key"):
+        _to_curl_option_key("NOT_A_REAL_OPTION")
+
+
+@pytest.mark.asyncio
+async def test_create_session_enables_dns_cache_and_keeps_overrides() -> None:
+    async with _create_session(
+        session_options={"curl_options": {CurlOpt.DNS_CACHE_TIMEOUT: 5}}
+    ) as session:
+        assert session.curl_options[CurlOpt.DNS_CACHE_TIMEOUT] == 5
+        assert session.curl_options[CurlOpt.DNS_SHUFFLE_ADDRESSES] == 1
+        assert session.curl_options[CurlOpt.TCP_KEEPALIVE] == 1
+
+
+@pytest.mark.asyncio
+async def test_get_session_reuses_pooled_session_until_closed() -> None:
+    session = await _get_session()
+    try:
+        assert await _get_session() is session
+    finally:
+        await aclose()
+    assert session._closed is True
+    replacement = await _get_session()
+    try:
+        assert replacement is not session
+    finally:
+        await aclose()
+
+
+@pytest.mark.asyncio
+async def test_fetch_revalidates_cached_body_with_etag(test_server_url: str) -> None:
+    _TestHandler.not_modified = 0
+    session = await _get_session()
+    try:
+        first = await _fetch(session, url=f"{test_server_url}/etag")
+        second = await _fetch(session, url=f"{test_server_url}/etag", max_chars=6)
+    finally:
+        await aclose()
+    assert first.text == "cached body"
+    assert second.status_code == 200
+    assert second.text == "cached\n[truncated at 6 chars]"
+    assert _TestHandler.not_modified == 1
+    # Replayed headers come from the 304, not the original 200.
+    headers = {k.lower(): v for k, v in second.headers.items()}
+    assert headers["cache-control"] == "max-age=60"
+    assert headers["content-type"] == "text/plain; charset=utf-8"
+    assert "set-cookie" not in headers
+    assert {k.lower(): v for k, v in first.headers.items()}["cache-control"] == "no-cache"
+
+
 @pytest.mark.asyncio
 async def test_fetch_html_success(test_server_url: str) -> None:
     async with _create_session() as session:
@@ -183,6 +291,22 @@ async def test_fetch_truncates_large_content(test_server_url: str) -> None:
     assert result.text.endswith("[truncated at 20 chars]")
 
 
+@pytest.mark.asyncio
+async def test_fetch_stops_reading_after_max_chars(test_server_url: str) -> None:
+    async with _create_session() as session:
+        result = await _fetch(session, url=f"{test_server_url}/huge", max_chars=1_000)
+    assert result.text == "y" * 1_000 + "\n[truncated at 1000 chars]"
+
+
+@pytest.mark.asyncio
+async def test_fetch_decodes_streamed_body_with_declared_charset(test_server_url: str) -> None:
+    async with _create_session() as session:
+        latin1 = await _fetch(session, url=f"{test_server_url}/latin1")
+        multibyte = await _fetch(session, url=f"{test_server_url}/multibyte")
+    assert latin1.text == "caf\u00e9 cr\u00e8me"
+    assert multibyte.text == "\u00e9" * 100_000
+
+
 @pytest.mark.asyncio
 async def test_fetch_passes_request_options_params(test_server_url: str) -> None:
     async with _create_session() as session:
@@ -208,3 +332,20 @@ async def test_fetch_passes_request_options_headers(test_server_url: str) -> Non
         )
     parsed = json.loads(result.text)
     assert parsed["referer"] == "https://example.com/source"
+
+
+@pytest.mark.asyncio
+async def test_fetch_advertises_compressed_encodings(test_server_url: str) -> None:
+    async with _create_session() as session:
+        result = await _fetch(session, url=f"{test_server_url}/headers")
+    encodings = {e.strip() for e in json.loads(result.text)["accept_encoding"].split(",")}
+    assert {"gzip", "br", "zstd"} <= encodings
+
+
+@pytest.mark.asyncio
+async def test_fetch_does_not_mutate_shared_request_options(test_server_url: str) -> None:
+    shared = {"timeout": 5.0, "stream": False, "headers": {"X-Test": "1"}}
+    async with _create_session() as session:
+        await _fetch(session, url=f"{test_server_url}/html", request_options=shared)
+        await _fetch(session, url=f"{test_server_url}/html", request_options=shared)
+    assert shared == {"timeout": 5.0, "stream": False, "headers": {"X-Test": "1"}}
@@ -1,15 +1,20 @@
 from __future__ import annotations
 
 import json
+import math
 
 import pytest
 
 from stealth_fetch_mcp.parser import (
     _clean_html,
     _resolve_url,
+    aclean_html,
+    aextract_links,
+    aparse_feed,
     extract_links,
     extract_metadata,
     extract_tables,
+    parse,
     parse_feed,
 )
 
@@ -65,6 +70,43 @@ def test_clean_html_scoped_selector_and_fallback() -> None:
     assert "Other Section" in fallback
 
 
+def test_clean_html_ignores_selector_matches_inside_noise() -> None:
+    html = "<html><body><nav><p class='x'>menu</p></nav><p>Body</p></body></html>"
+    text = _clean_html(html, selector=".x")
+    assert text == "[selector not found: .x]\n\nBody"
+
+
+def test_clean_html_skips_comments_and_accepts_xml_declaration() -> None:
+    html = (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        "<html><body><p>Visible <!-- hidden --> text</p></body></html>"
+    )
+    assert _clean_html(html) == "Visible text"
+
+
+def test_clean_html_descends_into_wrapper_divs() -> None:
+    html = (
+        "<html><body><div id='app'><main><article><h1>Title</h1><p>First para.</p>"
+        "<h2>Section</h2><ul><li>one</li><li>two</li></ul></article></main></div>"
+        "<div>Leaf <b>div</b></div></body></html>"
+    )
+    assert _clean_html(html).split("\n") == [
+        "Title First para. Section one two",
+        "# Title",
+        "First para.",
+        "## Section",
+        "- one",
+        "- two",
+        "Leaf div",
+    ]
+
+
+def test_clean_html_contains_selector_works_on_repeated_calls() -> None:
+    for word in ("first", "second", "third"):
+        html = f"<html><body><div><p>skip</p></div><div><p>keep {word}</p></div></body></html>"
+        assert _clean_html(html, selector="div:contains('keep')") == f"keep {word}"
+
+
 def test_clean_html_truncates_with_marker() -> None:
     html = "<html><body><p>" + ("x" * 50) + "</p></body></html>"
     text = _clean_html(html, max_chars=20)
@@ -97,6 +139,11 @@ def test_extract_links_with_pattern_and_max_results() -> None:
     assert data[0]["absolute_url"] == "https://example.com/news/1"
 
 
+def test_extract_links_emits_unescaped_unicode() -> None:
+    payload = extract_links(html="<a href='/cafe'>Caf\u00e9</a>", base_url="https://example.com")
+    assert '"text": "Caf\u00e9"' in payload
+
+
 def test_extract_links_invalid_regex_raises_value_error() -> None:
     with pytest.raises(ValueError, match="Invalid regex pattern"):
         extract_links(
@@ -142,6 +189,17 @@ def test_extract_metadata_invalid_json_ld_skipped() -> None:
     assert data["json_ld"] == []
 
 
+def test_extract_metadata_keeps_json_ld_outside_orjson_range() -> None:
+    html = (
+        '<html><head><script type="application/ld+json">'
+        '{"id": 123456789012345678901234567890, "score": NaN}'
+        "</script></head></html>"
+    )
+    data = json.loads(extract_metadata(html))
+    assert data["json_ld"][0]["id"] == 123456789012345678901234567890
+    assert math.isnan(data["json_ld"][0]["score"])
+
+
 def test_extract_metadata_empty_page() -> None:
     data = json.loads(extract_metadata("<html></html>"))
     assert data == {"json_ld": [], "opengraph": {}, "twitter": {}, "meta": {}}
@@ -207,6 +265,24 @@ def test_extract_tables_empty_page() -> None:
     assert data == []
 
 
+# --- parse ---
+
+
+def test_parsed_doc_is_shared_across_extractors() -> None:
+    html = """
+    <html><head><meta property="og:title" content="Shared"></head>
+    <body><p>Body text</p><a href="/next">Next</a>
+    <table><tr><th>K</th></tr><tr><td>V</td></tr></table></body></html>
+    """
+    doc = parse(html)
+    tree = doc.tree
+    assert _clean_html(doc) == _clean_html(html)
+    assert extract_links(doc, "https://example.com") == extract_links(html, "https://example.com")
+    assert extract_metadata(doc) == extract_metadata(html)
+    assert extract_tables(doc) == extract_tables(html)
+    assert doc.tree is tree
+
+
 # --- parse_feed ---
 
 _RSS_SAMPLE = """<?xml version="1.0"?>
@@ -257,6 +333,20 @@ def test_parse_feed_rss_max_items() -> None:
     assert len(data["items"]) == 1
 
 
+def test_parse_feed_stops_after_max_items() -> None:
+    # Anything past the last requested item is never parsed, malformed or not.
+    truncated = _RSS_SAMPLE.split("<item>", 2)
+    data = json.loads(parse_feed("<item>".join(truncated[:2]) + "<item><title>cut", max_items=1))
+    assert data["feed_title"] == "My Blog"
+    assert [item["title"] for item in data["items"]] == ["First Post"]
+
+
+def test_parse_feed_accepts_declared_encoding() -> None:
+    xml = _RSS_SAMPLE.replace('<?xml version="1.0"?>', '<?xml version="1.0" encoding="ISO-8859-1"?>')
+    data = json.loads(parse_feed(xml.replace("My Blog", "Café")))
+    assert data["feed_title"] == "Café"
+
+
 def test_parse_feed_atom() -> None:
     data = json.loads(parse_feed(_ATOM_SAMPLE))
     assert data["feed_title"] == "Atom Feed"
@@ -276,3 +366,74 @@ def test_parse_feed_invalid_xml_raises() -> None:
 def test_parse_feed_unknown_root_raises() -> None:
     with pytest.raises(ValueError, match="Unrecognized feed format"):
         parse_feed("<html><body>not a feed</body></html>")
+
+
+# --- async entry points ---
+
+
+@pytest.mark.asyncio
+async def test_async_entry_points_match_sync_results() -> None:
+    html = "<html><body><p>Hello <a href='/x'>there</a></p></body></html>"
+    assert await aclean_html(html, max_chars=100) == _clean_html(html, max_chars=100)
+    assert await aextract_links(html, "https://example.com") == extract_links(
+        html, "https://example.com"
+    )
+    assert await aparse_feed(_RSS_SAMPLE, max_items=1) == parse_feed(_RSS_SAMPLE, max_items=1)
+
+
+@pytest.mark.asyncio
+async def test_aclean_html_memoises_per_selector_and_limit() -> None:
+    html = "<html><body><main><p>Inside main</p></main><p>Outside</p></body></html>"
+    full = await aclean_html(html, max_chars=100)
+    assert await aclean_html(html, max_chars=100) is full
+    assert await aclean_html(html, selector="main", max_chars=100) == "Inside main"
+    assert await aclean_html(html, max_chars=6) == _clean_html(html, max_chars=6)
+
+
+def test_lexbor_and_lxml_paths_agree() -> None:
+    pytest.importorskip("selectolax")
+    from stealth_fetch_mcp.parser import (
+        _links_lexbor,
+        _links_lxml,
+        _metadata_lexbor,
+        _metadata_lxml,
+        _tables_lexbor,
+        _tables_lxml,
+    )
+
+    html = """
+    <html><head>
+      <script type="application/ld+json">{"@type": "Thing"}</script>
+      <script type="application/ld+json">{"id": 123456789012345678901234567890}</script>
+      <meta property="og:title" content="OG"><meta name="twitter:card" content="c">
+      <meta http-equiv="refresh" content="5"><meta name="empty" content>
+    </head><body>
+      <a href=" /a ">One <b>bold</b><script>skip()</script><!-- c --> tail</a>
+      <a href="">blank</a><a href="/b"></a><nav><a href="/c">Nav</a></nav>
+    </body></html>
+    """
+    doc = parse(html)
+    args = ("https://example.com", "a[href]", None, 10)
+    assert _links_lexbor(doc, *args) == _links_lxml(doc, *args)
+    assert _links_lexbor(doc, "https://example.com", "nav a", None, 10) == _links_lxml(
+        doc, "https://example.com", "nav a", None, 10
+    )
+    # Selectors lexbor cannot parse fall back to cssselect instead of failing.
+    contains = "a:contains('One')"
+    links = _links_lxml(doc, "https://example.com", contains, None, 100)
+    assert [link["href"] for link in links] == ["/a"]
+    assert json.loads(extract_links(doc, "https://example.com", contains)) == links
+    assert _metadata_lexbor(doc) == _metadata_lxml(doc)
+    assert _metadata_lxml(doc)[0]["json_ld"][1] == {"id": 123456789012345678901234567890}
+
+    tables = parse(
+        "<div id='t'><table><tr><td>x</td><th>H</th></tr><tr><td>a <i>b</i></td><td></td></tr>"
+        "<tr><td></td></tr><tr><td><table><tr><th>in</th></tr></table></td></tr></table></div>"
+        "<table><thead><tr><th>A</th></tr></thead><tbody><tr><td>1</td></tr></tbody></table>"
+        "<table><tr><td>x<!-- c --><style>p{}</style> y</td></tr></table>"
+    )
+    for selector in (None, "#t", "#missing", "table"):
+        assert _tables_lexbor(tables, selector) == _tables_lxml(tables, selector)
+    assert _tables_lxml(tables, None)[-1]["rows"] == [["x y"]]
+    contains = "table:contains('A')"
+    assert json.loads(extract_tables(tables, contains)) == _tables_lxml(tables, contains)
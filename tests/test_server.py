@@ -1,16 +1,26 @@
 from __future__ import annotations
 
-import inspect
+import asyncio
+import itertools
 import json
+import signal
 import threading
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
 from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, ClassVar
 
+import orjson
 import pytest
+import pytest_asyncio
 from mcp.types import ToolAnnotations
-from pydantic import ValidationError
+from pydantic import BaseModel, ValidationError
 
+from stealth_fetch_mcp.client import _create_session
 from stealth_fetch_mcp.server import (
+    AppContext,
     BulkUrlInput,
+    SessionOptionsInput,
     StealthExtractLinksInput,
     StealthExtractMetadataInput,
     StealthExtractTablesInput,
@@ -20,6 +30,9 @@ from stealth_fetch_mcp.server import (
     StealthFetchJsonInput,
     StealthFetchPageInput,
     StealthFetchTextInput,
+    _options_to_dict,
+    _pretty_json,
+    _session_scope,
     _stealth_extract_links_impl,
     _stealth_extract_metadata_impl,
     _stealth_extract_tables_impl,
@@ -35,98 +48,130 @@ from stealth_fetch_mcp.server import (
 )
 
 
+def _static_response(content_type: str, body: bytes) -> bytes:
+    # A complete HTTP/1.1 response, written with one wfile.write instead of per-header calls.
+    head = f"HTTP/1.1 200 OK\r\nContent-Type: {content_type}\r\nContent-Length: {len(body)}\r\n\r\n"
+    return head.encode("latin-1") + body
+
+
+_PAGE_RESPONSE = _static_response(
+    "text/html",
+    b"<html><body><nav>menu</nav><h1>Server</h1><a href='/a'>A</a></body></html>",
+)
+_JSON_RESPONSE = _static_response("application/json", b'{"status":"ok","items":[1,2,3]}')
+_META_RESPONSE = _static_response(
+    "text/html",
+    b'<html><head>'
+    b'<script type="application/ld+json">{"@type":"WebPage"}</script>'
+    b'<meta property="og:title" content="Test OG" />'
+    b'<meta name="twitter:card" content="summary" />'
+    b'<meta name="description" content="Test page" />'
+    b'</head><body></body></html>',
+)
+_TABLES_RESPONSE = _static_response(
+    "text/html",
+    b"<html><body>"
+    b"<table>"
+    b"<thead><tr><th>A</th><th>B</th></tr></thead>"
+    b"<tbody><tr><td>1</td><td>2</td></tr></tbody>"
+    b"</table>"
+    b"</body></html>",
+)
+_FEED_RESPONSE = _static_response(
+    "application/rss+xml",
+    b'<?xml version="1.0"?>'
+    b"<rss version=\"2.0\"><channel>"
+    b"<title>Test Feed</title>"
+    b"<link>http://localhost/</link>"
+    b"<item><title>Item 1</title><link>http://localhost/1</link>"
+    b"<description>Desc</description></item>"
+    b"</channel></rss>",
+)
+_INSPECT_PREFIX = b"<html><body><p>path="
+_INSPECT_MID = b"</p><p>referer="
+_INSPECT_SUFFIX = b"</p></body></html>"
+
+
 class _ServerHandler(BaseHTTPRequestHandler):
+    # Keep-alive lets the session pool reuse its sockets, so every reply carries Content-Length.
+    protocol_version = "HTTP/1.1"
+    hits = itertools.count(1)
+    head_paths: ClassVar[list[str]] = []
+    in_flight_lock = threading.Lock()
+    in_flight = 0
+    peak_in_flight = 0
+    static_routes: ClassVar[dict[str, bytes]] = {
+        "/page": _PAGE_RESPONSE,
+        "/json": _JSON_RESPONSE,
+        "/meta": _META_RESPONSE,
+        "/tables": _TABLES_RESPONSE,
+        "/feed": _FEED_RESPONSE,
+    }
+
     def log_message(self, format: str, *args: object) -> None:  # noqa: A003
         return
 
+    def _send_empty(self, status: int) -> None:
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
     def do_GET(self) -> None:  # noqa: N802
-        if self.path == "/page":
-            self.send_response(200)
-            self.send_header("Content-Type", "text/html")
-            self.end_headers()
-            self.wfile.write(
-                b"<html><body><nav>menu</nav><h1>Server</h1><a href='/a'>A</a></body></html>"
-            )
+        response = self.static_routes.get(self.path)
+        if response is not None:
+            self.wfile.write(response)
             return
         if self.path.startswith("/inspect"):
-            self.send_response(200)
-            self.send_header("Content-Type", "text/html")
-            self.end_headers()
             referer = self.headers.get("Referer", "")
-            self.wfile.write(
+            body = b"".join(
                 (
-                    "<html><body>"
-                    f"<p>path={self.path}</p>"
-                    f"<p>referer={referer}</p>"
-                    "</body></html>"
-                ).encode("utf-8")
-            )
-            return
-        if self.path == "/json":
-            self.send_response(200)
-            self.send_header("Content-Type", "application/json")
-            self.end_headers()
-            self.wfile.write(b'{"status":"ok","items":[1,2,3]}')
-            return
-        if self.path == "/meta":
-            self.send_response(200)
-            self.send_header("Content-Type", "text/html")
-            self.end_headers()
-            self.wfile.write(
-                b'<html><head>'
-                b'<script type="application/ld+json">{"@type":"WebPage"}</script>'
-                b'<meta property="og:title" content="Test OG" />'
-                b'<meta name="twitter:card" content="summary" />'
-                b'<meta name="description" content="Test page" />'
-                b'</head><body></body></html>'
+                    _INSPECT_PREFIX,
+                    self.path.encode("utf-8"),
+                    _INSPECT_MID,
+                    referer.encode("utf-8"),
+                    _INSPECT_SUFFIX,
+                )
             )
+            self.wfile.write(_static_response("text/html", body))
             return
-        if self.path == "/tables":
-            self.send_response(200)
-            self.send_header("Content-Type", "text/html")
-            self.end_headers()
-            self.wfile.write(
-                b"<html><body>"
-                b"<table>"
-                b"<thead><tr><th>A</th><th>B</th></tr></thead>"
-                b"<tbody><tr><td>1</td><td>2</td></tr></tbody>"
-                b"</table>"
-                b"</body></html>"
-            )
+        if self.path == "/count":
+            self.wfile.write(_static_response("text/plain", str(next(self.hits)).encode()))
             return
-        if self.path == "/feed":
-            self.send_response(200)
-            self.send_header("Content-Type", "application/rss+xml")
-            self.end_headers()
-            self.wfile.write(
-                b'<?xml version="1.0"?>'
-                b"<rss version=\"2.0\"><channel>"
-                b"<title>Test Feed</title>"
-                b"<link>http://localhost/</link>"
-                b"<item><title>Item 1</title><link>http://localhost/1</link>"
-                b"<description>Desc</description></item>"
-                b"</channel></rss>"
-            )
+        if self.path.startswith("/slow"):
+            handler = type(self)
+            with handler.in_flight_lock:
+                handler.in_flight += 1
+                handler.peak_in_flight = max(handler.peak_in_flight, handler.in_flight)
+            time.sleep(0.05)
+            with handler.in_flight_lock:
+                handler.in_flight -= 1
+            self.wfile.write(_static_response("text/plain", b"slow"))
             return
-        self.send_response(404)
-        self.end_headers()
+        self._send_empty(404)
+
+    def do_HEAD(self) -> None:  # noqa: N802
+        self.head_paths.append(self.path)
+        self._send_empty(204)
 
     def do_POST(self) -> None:  # noqa: N802
         if self.path == "/json":
             length = int(self.headers.get("Content-Length", "0"))
-            body = self.rfile.read(length).decode("utf-8") if length else "{}"
-            self.send_response(200)
-            self.send_header("Content-Type", "application/json")
-            self.end_headers()
-            self.wfile.write(body.encode("utf-8"))
+            body = self.rfile.read(length) if length else b"{}"
+            self.wfile.write(_static_response("application/json", body))
             return
-        self.send_response(404)
-        self.end_headers()
+        self._send_empty(404)
+
+
+class _KeepAliveServer(ThreadingHTTPServer):
+    # Bulk fan-out opens many sockets at once; idle keep-alive threads must not block close.
+    request_queue_size = 32
+    block_on_close = False
 
 
-@pytest.fixture()
+# One server per module: handlers are stateless apart from counters tests reset first.
+@pytest.fixture(scope="module")
 def http_url() -> str:
-    server = ThreadingHTTPServer(("127.0.0.1", 0), _ServerHandler)
+    server = _KeepAliveServer(("127.0.0.1", 0), _ServerHandler)
     thread = threading.Thread(target=server.serve_forever, daemon=True)
     thread.start()
     try:
@@ -138,33 +183,96 @@ def http_url() -> str:
         thread.join(timeout=1)
 
 
-def test_input_models_validate_constraints() -> None:
-    StealthFetchPageInput(url="https://example.com")
-    StealthFetchTextInput(url="https://example.com", max_chars=100)
-    StealthFetchJsonInput(url="https://example.com", method="GET")
-    StealthExtractLinksInput(url="https://example.com", max_results=5)
-    StealthFetchPageInput(
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def live_context() -> AsyncIterator[AppContext]:
+    # A dedicated session rather than app_lifespan's pooled one, so the lifespan test can
+    # still open and close the real thing without tearing this down.
+    async with _create_session() as session:
+        yield AppContext(session=session)
+
+
+@pytest.mark.parametrize(
+    ("model", "kwargs"),
+    [
+        (StealthFetchPageInput, {"url": "https://example.com"}),
+        (StealthFetchPageInput, {"url": "HTTPS://example.com"}),
+        (StealthFetchTextInput, {"url": "https://example.com", "max_chars": 100}),
+        (StealthFetchJsonInput, {"url": "https://example.com", "method": "GET"}),
+        (StealthExtractLinksInput, {"url": "https://example.com", "max_results": 5}),
+        (
+            StealthFetchPageInput,
+            {
+                "url": "https://example.com",
+                "session_options": {"verify": False, "default_headers": False},
+                "request_options": {
+                    "params": {"q": "x"},
+                    "referer": "https://example.com/from",
+                    "quote": False,
+                    "http_version": "v2",
+                },
+            },
+        ),
+    ],
+)
+def test_input_models_accept_valid_input(model: type[BaseModel], kwargs: dict[str, Any]) -> None:
+    model(**kwargs)
+
+
+@pytest.mark.parametrize(
+    ("model", "kwargs", "match"),
+    [
+        (StealthFetchPageInput, {"url": "ftp://example.com"}, None),
+        (StealthFetchPageInput, {"url": "https:example.com"}, None),
+        (StealthFetchTextInput, {"url": "https://example.com", "max_chars": 0}, None),
+        (StealthExtractLinksInput, {"url": "https://example.com", "max_results": 0}, None),
+        (
+            StealthExtractLinksInput,
+            {"url": "https://example.com", "pattern": "("},
+            "Invalid regex pattern",
+        ),
+        (
+            StealthFetchPageInput,
+            {"url": "https://example.com", "request_options": {"stream": True}},
+            None,
+        ),
+    ],
+)
+def test_input_models_reject_invalid_input(
+    model: type[BaseModel], kwargs: dict[str, Any], match: str | None
+) -> None:
+    with pytest.raises(ValidationError, match=match):
+        model(**kwargs)
+
+
+def test_options_to_dict_matches_model_dump() -> None:
+    options = StealthFetchPageInput(
         url="https://example.com",
-        session_options={"verify": False, "default_headers": False},
         request_options={
-            "params": {"q": "x"},
-            "referer": "https://example.com/from",
-            "quote": False,
-            "http_version": "v2",
+            "json": {"q": 1},
+            "params": [("a", "1")],
+            "timeout": None,
+            "extra_fp": {"tls_grease": True},
+            "curl_options": [{"option": "TIMEOUT_MS", "value": 8000}],
         },
-    )
+    ).request_options
+    assert options is not None
 
-    with pytest.raises(ValidationError):
-        StealthFetchPageInput(url="ftp://example.com")
-    with pytest.raises(ValidationError):
-        StealthFetchTextInput(url="https://example.com", max_chars=0)
-    with pytest.raises(ValidationError):
-        StealthExtractLinksInput(url="https://example.com", max_results=0)
-    with pytest.raises(ValidationError):
-        StealthFetchPageInput(
-            url="https://example.com",
-            request_options={"stream": True},
-        )
+    expected = options.model_dump(exclude_none=True, by_alias=True)
+    expected["curl_options"] = {"TIMEOUT_MS": 8000}
+    assert _options_to_dict(options) == expected
+    assert "json_body" not in _options_to_dict(options)
+
+
+def test_pretty_json_falls_back_for_values_outside_orjson_range() -> None:
+    assert _pretty_json('{"a": [1]}') == '{\n  "a": [\n    1\n  ]\n}'
+    assert json.loads(_pretty_json('{"id": 123456789012345678901234567890}')) == {
+        "id": 123456789012345678901234567890
+    }
+    assert _pretty_json('{"x": NaN}') == '{\n  "x": NaN\n}'
+    assert json.loads(_pretty_json('{"a": "\\ud800"}')) == {"a": "\ud800"}
+    assert _pretty_json('{"x": 1e400}') == '{\n  "x": Infinity\n}'
+    with pytest.raises(json.JSONDecodeError):
+        _pretty_json("not json")
 
 
 def test_tools_are_registered_with_expected_annotations() -> None:
@@ -209,141 +317,248 @@ async def test_lifespan_creates_and_closes_session() -> None:
 
 
 @pytest.mark.asyncio
-async def test_tool_impls_work_with_live_http_server(http_url: str) -> None:
-    async with app_lifespan(mcp) as context:
-        page = await _stealth_fetch_page_impl(
-            StealthFetchPageInput(url=f"{http_url}/page"), context.session
-        )
-        text = await _stealth_fetch_text_impl(
-            StealthFetchTextInput(url=f"{http_url}/page"), context.session
-        )
-        response_json = await _stealth_fetch_json_impl(
-            StealthFetchJsonInput(url=f"{http_url}/json", method="GET"), context.session
-        )
-        links = await _stealth_extract_links_impl(
-            StealthExtractLinksInput(url=f"{http_url}/page", max_results=5),
-            context.session,
-        )
+async def test_overlapping_lifespans_share_session_until_last_exits() -> None:
+    async with app_lifespan(mcp) as outer:
+        async with app_lifespan(mcp) as inner:
+            assert inner.session is outer.session
+        assert outer.session._closed is False
+    assert outer.session._closed is True
+
+
+@pytest.mark.asyncio(loop_scope="module")
+async def test_session_scope_reuses_shared_session_without_overrides(
+    live_context: AppContext
+) -> None:
+    for options in (None, SessionOptionsInput(), SessionOptionsInput(proxy=None)):
+        async with _session_scope(live_context.session, options) as active:
+            assert active is live_context.session
+    async with _session_scope(live_context.session, SessionOptionsInput(verify=False)) as active:
+        assert active is not live_context.session
+
+
+@pytest.mark.asyncio(loop_scope="module")
+async def test_tool_impls_work_with_live_http_server(
+    http_url: str, live_context: AppContext
+) -> None:
+    session = live_context.session
+    page, text, response_json, raw_json, links = await asyncio.gather(
+        _stealth_fetch_page_impl(StealthFetchPageInput(url=f"{http_url}/page"), session),
+        _stealth_fetch_text_impl(StealthFetchTextInput(url=f"{http_url}/page"), session),
+        _stealth_fetch_json_impl(
+            StealthFetchJsonInput(url=f"{http_url}/json", method="GET"), session
+        ),
+        _stealth_fetch_json_impl(StealthFetchJsonInput(url=f"{http_url}/json", raw=True), session),
+        _stealth_extract_links_impl(
+            StealthExtractLinksInput(url=f"{http_url}/page", max_results=5), session
+        ),
+    )
 
     assert "<h1>Server</h1>" in page
     assert "# Server" in text
     assert '"status": "ok"' in response_json
-    parsed_links = json.loads(links)
+    assert raw_json == '{"status":"ok","items":[1,2,3]}'
+    parsed_links = orjson.loads(links)
     assert parsed_links[0]["absolute_url"].endswith("/a")
 
 
-@pytest.mark.asyncio
-async def test_tool_impl_applies_request_options(http_url: str) -> None:
-    async with app_lifespan(mcp) as context:
-        page = await _stealth_fetch_page_impl(
-            StealthFetchPageInput(
-                url=f"{http_url}/inspect",
-                request_options={
-                    "params": {"q": "1"},
-                    "referer": "https://example.com/from",
-                    "default_headers": False,
-                },
-            ),
-            context.session,
-        )
+@pytest.mark.asyncio(loop_scope="module")
+async def test_tool_impl_applies_request_options(http_url: str, live_context: AppContext) -> None:
+    page = await _stealth_fetch_page_impl(
+        StealthFetchPageInput(
+            url=f"{http_url}/inspect",
+            request_options={
+                "params": {"q": "1"},
+                "referer": "https://example.com/from",
+                "default_headers": False,
+            },
+        ),
+        live_context.session,
+    )
 
     assert "path=/inspect?q=1" in page
     assert "referer=https://example.com/from" in page
 
 
-def test_main_contains_stdio_run() -> None:
-    source = inspect.getsource(main)
-    assert "mcp.run(" in source
-
-
-@pytest.mark.asyncio
-async def test_stealth_fetch_headers_impl(http_url: str) -> None:
-    async with app_lifespan(mcp) as context:
-        result = await _stealth_fetch_headers_impl(
-            StealthFetchHeadersInput(url=f"{http_url}/page"),
-            context.session,
-        )
-    data = json.loads(result)
-    assert data["status_code"] == 200
-    assert data["final_url"].endswith("/page")
-    assert any(k.lower() == "content-type" for k in data["headers"])
-
-
-@pytest.mark.asyncio
-async def test_stealth_extract_metadata_impl(http_url: str) -> None:
-    async with app_lifespan(mcp) as context:
-        result = await _stealth_extract_metadata_impl(
-            StealthExtractMetadataInput(url=f"{http_url}/meta"),
-            context.session,
-        )
-    data = json.loads(result)
-    assert data["json_ld"] == [{"@type": "WebPage"}]
-    assert data["opengraph"]["title"] == "Test OG"
-    assert data["twitter"]["card"] == "summary"
-    assert data["meta"]["description"] == "Test page"
-
-
-@pytest.mark.asyncio
-async def test_stealth_extract_tables_impl(http_url: str) -> None:
-    async with app_lifespan(mcp) as context:
-        result = await _stealth_extract_tables_impl(
-            StealthExtractTablesInput(url=f"{http_url}/tables"),
-            context.session,
-        )
-    data = json.loads(result)
-    assert len(data) == 1
-    assert data[0]["headers"] == ["A", "B"]
-    assert data[0]["rows"] == [["1", "2"]]
-
-
-@pytest.mark.asyncio
-async def test_stealth_fetch_feed_impl(http_url: str) -> None:
-    async with app_lifespan(mcp) as context:
-        result = await _stealth_fetch_feed_impl(
-            StealthFetchFeedInput(url=f"{http_url}/feed"),
-            context.session,
-        )
-    data = json.loads(result)
-    assert data["feed_title"] == "Test Feed"
-    assert len(data["items"]) == 1
-    assert data["items"][0]["title"] == "Item 1"
-    assert data["items"][0]["summary"] == "Desc"
-
-
-@pytest.mark.asyncio
-async def test_stealth_fetch_bulk_impl(http_url: str) -> None:
-    async with app_lifespan(mcp) as context:
-        result = await _stealth_fetch_bulk_impl(
-            StealthFetchBulkInput(
-                urls=[
-                    BulkUrlInput(url=f"{http_url}/page"),
-                    BulkUrlInput(url=f"{http_url}/json"),
-                ],
+def test_main_runs_stdio_server(monkeypatch: pytest.MonkeyPatch) -> None:
+    runs: list[tuple[object, ...]] = []
+    monkeypatch.setattr(mcp, "run", lambda *args, **kwargs: runs.append(args))
+    monkeypatch.setattr("stealth_fetch_mcp.server._install_uvloop", lambda: None)
+    previous = signal.getsignal(signal.SIGTERM)
+    try:
+        main()
+        assert signal.getsignal(signal.SIGTERM) is not previous
+    finally:
+        signal.signal(signal.SIGTERM, previous)
+    assert runs == [()]
+
+
+# Each row: impl, input built from the server URL, a projection of the JSON output, and
+# the value that projection must equal.
+@pytest.mark.parametrize(
+    ("impl", "make_input", "project", "expected"),
+    [
+        pytest.param(
+            _stealth_fetch_headers_impl,
+            lambda base: StealthFetchHeadersInput(url=f"{base}/page"),
+            lambda data: (
+                data["status_code"],
+                data["final_url"].rsplit("/", 1)[-1],
+                any(k.lower() == "content-type" for k in data["headers"]),
+            ),
+            (200, "page", True),
+            id="headers",
+        ),
+        pytest.param(
+            _stealth_extract_metadata_impl,
+            lambda base: StealthExtractMetadataInput(url=f"{base}/meta"),
+            lambda data: (
+                data["json_ld"],
+                data["opengraph"]["title"],
+                data["twitter"]["card"],
+                data["meta"]["description"],
+            ),
+            ([{"@type": "WebPage"}], "Test OG", "summary", "Test page"),
+            id="metadata",
+        ),
+        pytest.param(
+            _stealth_extract_tables_impl,
+            lambda base: StealthExtractTablesInput(url=f"{base}/tables"),
+            lambda data: [(table["headers"], table["rows"]) for table in data],
+            [(["A", "B"], [["1", "2"]])],
+            id="tables",
+        ),
+        pytest.param(
+            _stealth_fetch_feed_impl,
+            lambda base: StealthFetchFeedInput(url=f"{base}/feed"),
+            lambda data: (
+                data["feed_title"],
+                [(item["title"], item["summary"]) for item in data["items"]],
+            ),
+            ("Test Feed", [("Item 1", "Desc")]),
+            id="feed",
+        ),
+        pytest.param(
+            _stealth_fetch_bulk_impl,
+            lambda base: StealthFetchBulkInput(
+                urls=[BulkUrlInput(url=f"{base}/page"), BulkUrlInput(url=f"{base}/json")],
                 max_concurrency=2,
             ),
-            context.session,
-        )
-    data = json.loads(result)
-    assert len(data) == 2
+            lambda data: sorted((r["status"], r["url"].rsplit("/", 1)[-1]) for r in data),
+            [("ok", "json"), ("ok", "page")],
+            id="bulk",
+        ),
+    ],
+)
+@pytest.mark.asyncio(loop_scope="module")
+async def test_tool_impl_output(
+    http_url: str,
+    live_context: AppContext,
+    impl: Callable[[Any, Any], Awaitable[str]],
+    make_input: Callable[[str], Any],
+    project: Callable[[Any], object],
+    expected: object,
+) -> None:
+    result = await impl(make_input(http_url), live_context.session)
+    assert project(orjson.loads(result)) == expected
+
+
+@pytest.mark.asyncio(loop_scope="module")
+async def test_stealth_fetch_bulk_fetches_repeated_urls_once(
+    http_url: str, live_context: AppContext
+) -> None:
+    count_url = f"{http_url}/count"
+    result = await _stealth_fetch_bulk_impl(
+        StealthFetchBulkInput(
+            urls=[
+                BulkUrlInput(url=count_url),
+                BulkUrlInput(url=f"{http_url}/page"),
+                BulkUrlInput(url=count_url),
+                BulkUrlInput(url=f"{count_url}#top"),
+            ],
+        ),
+        live_context.session,
+    )
+    follow_up = await _stealth_fetch_page_impl(
+        StealthFetchPageInput(url=count_url), live_context.session
+    )
+    data = orjson.loads(result)
+    assert [r["url"] for r in data] == [
+        count_url,
+        f"{http_url}/page",
+        count_url,
+        f"{count_url}#top",
+    ]
+    assert data[0] == data[2]
+    assert data[3]["text"] == data[0]["text"]
+    assert int(follow_up) == int(data[0]["text"]) + 1
+
+
+@pytest.mark.asyncio(loop_scope="module")
+async def test_stealth_fetch_bulk_sends_only_the_requested_gets(
+    http_url: str, live_context: AppContext
+) -> None:
+    # Nothing runs ahead of the batch: no HEAD to the origin root gates the GETs.
+    _ServerHandler.head_paths.clear()
+    result = await _stealth_fetch_bulk_impl(
+        StealthFetchBulkInput(
+            urls=[BulkUrlInput(url=f"{http_url}/page"), BulkUrlInput(url=f"{http_url}/json")]
+        ),
+        live_context.session,
+    )
+    assert all(r["status"] == "ok" for r in orjson.loads(result))
+    assert _ServerHandler.head_paths == []
+
+
+@pytest.mark.asyncio(loop_scope="module")
+async def test_stealth_fetch_bulk_limits_requests_per_host(
+    http_url: str, live_context: AppContext
+) -> None:
+    _ServerHandler.peak_in_flight = 0
+    result = await _stealth_fetch_bulk_impl(
+        StealthFetchBulkInput(
+            urls=[BulkUrlInput(url=f"{http_url}/slow?{i}") for i in range(6)],
+            max_concurrency=6,
+            max_per_host=2,
+        ),
+        live_context.session,
+    )
+    data = orjson.loads(result)
     assert all(r["status"] == "ok" for r in data)
-    urls = {r["url"] for r in data}
-    assert f"{http_url}/page" in urls
-    assert f"{http_url}/json" in urls
-
-
-@pytest.mark.asyncio
-async def test_stealth_fetch_bulk_isolates_errors(http_url: str) -> None:
-    async with app_lifespan(mcp) as context:
-        result = await _stealth_fetch_bulk_impl(
-            StealthFetchBulkInput(
-                urls=[
-                    BulkUrlInput(url=f"{http_url}/page"),
-                    BulkUrlInput(url=f"{http_url}/nonexistent"),
-                ],
-            ),
-            context.session,
-        )
-    data = json.loads(result)
+    assert 1 <= _ServerHandler.peak_in_flight <= 2
+
+
+@pytest.mark.asyncio(loop_scope="module")
+async def test_stealth_fetch_bulk_isolates_errors(http_url: str, live_context: AppContext) -> None:
+    result = await _stealth_fetch_bulk_impl(
+        StealthFetchBulkInput(
+            urls=[
+                BulkUrlInput(url=f"{http_url}/page"),
+                BulkUrlInput(url=f"{http_url}/nonexistent"),
+            ],
+        ),
+        live_context.session,
+    )
+    data = orjson.loads(result)
     statuses = {r["url"].rsplit("/", 1)[-1]: r["status"] for r in data}
     assert statuses["page"] == "ok"
     assert statuses["nonexistent"] == "error"
+
+
+@pytest.mark.asyncio(loop_scope="module")
+async def test_stealth_fetch_bulk_reports_unexpected_errors_per_url(
+    http_url: str, live_context: AppContext
+) -> None:
+    # Skips validation so `_fetch` itself raises a plain ValueError for the ftp entry.
+    result = await _stealth_fetch_bulk_impl(
+        StealthFetchBulkInput(
+            urls=[
+                BulkUrlInput(url=f"{http_url}/page"),
+                BulkUrlInput.model_construct(url="ftp://example.com/file"),
+            ],
+        ),
+        live_context.session,
+    )
+    page, ftp = orjson.loads(result)
+    assert page["status"] == "ok"
+    assert ftp["status"] == "error"
+    assert ftp["error"] == "Request failed: ValueError: Only http/https URLs are supported."